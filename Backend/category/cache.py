@@ -0,0 +1,37 @@
+"""Per-user category sets cached under the category versions"""
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from expense_tracker.versions import DEFAULTS, bump_version, get_versions
+from .models import Category
+
+CACHE_TIMEOUT = 24 * 60 * 60
+FIELDS = ("id", "name", "user_id", "is_default", "is_deleted")
+
+
+def get_category_set(user_id):
+    """
+    Return the default categories plus the user's own, deleted ones
+    included, as an `id -> {id, name, user_id, is_default, is_deleted}`
+    dict in list order (name, id). The cache key embeds the user's and the
+    defaults' "categories" versions, which every category write bumps.
+    """
+    versions = get_versions(("categories", user_id), ("categories", DEFAULTS))
+    key = "category-set:{}:{}".format(
+        user_id, "-".join(str(version) for version in versions)
+    )
+    categories = cache.get(key)
+    if categories is None:
+        rows = Category.objects.filter(Q(user_id=user_id) | Q(is_default=True))
+        rows = sorted(rows.values(*FIELDS), key=lambda row: (row["name"], str(row["id"])))
+        categories = {row["id"]: row for row in rows}
+        cache.set(key, categories, timeout=CACHE_TIMEOUT)
+    return categories
+
+
+def bump_category_version(category):
+    """Invalidate cached data that embeds this category's name or state."""
+    bump_version("categories", category.user_id)
+    if category.is_default:
+        bump_version("categories", DEFAULTS)
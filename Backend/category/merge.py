@@ -0,0 +1,68 @@
+"""Merging categories by re-pointing their transactions in bulk"""
+
+from django.db.models import Q
+from django.db.transaction import atomic
+from rest_framework.exceptions import ValidationError
+
+from expense_tracker.utils import as_uuid
+from transaction import rollups
+from transaction.models import Transaction
+from .cache import bump_category_version
+from .models import Category
+
+MAX_SOURCES = 100
+
+
+def merge_categories(user, sources, target):
+    """
+    Re-point every transaction of the `sources` categories to `target` with
+    one UPDATE, move their rollups and soft-delete the sources, in a single
+    database transaction. Only the affected rows are locked. Users merge
+    their own categories, including already soft-deleted ones, into a live
+    category of their own or a default one; staff can merge any. Returns
+    `(transactions moved, categories newly deleted)`.
+    """
+    if not isinstance(sources, list) or not sources:
+        raise ValidationError({"sources": "Provide a non-empty list of category ids."})
+    if len(sources) > MAX_SOURCES:
+        raise ValidationError({"sources": f"At most {MAX_SOURCES} categories per merge."})
+    source_ids = {as_uuid(source) for source in sources}
+    if None in source_ids:
+        raise ValidationError({"sources": "Expected a list of category ids."})
+    target_id = as_uuid(target)
+    if target_id is None:
+        raise ValidationError({"target": "A valid category id is required."})
+    if target_id in source_ids:
+        raise ValidationError({"target": "The target cannot also be a source."})
+
+    # Sources may already be soft-deleted; only the target has to be live
+    categories = Category.objects.all()
+    if not user.is_staff:
+        categories = categories.filter(Q(user=user) | Q(is_default=True))
+
+    with atomic():
+        found = categories.select_for_update().in_bulk([*source_ids, target_id])
+        target = found.get(target_id)
+        if target is None or target.is_deleted:
+            raise ValidationError(
+                {"target": "Category not found or you do not have permission to use it."}
+            )
+        merged = [found[source_id] for source_id in source_ids if source_id in found]
+        if len(merged) != len(source_ids) or (
+            not user.is_staff and any(source.user_id != user.id for source in merged)
+        ):
+            raise ValidationError(
+                {"sources": "Categories not found or you do not have permission to merge them."}
+            )
+
+        moved = Transaction.objects.filter(category_id__in=source_ids).update(
+            category_id=target_id
+        )
+        rollups.reassign_categories(source_ids, target_id)
+        deleted = Category.objects.filter(id__in=source_ids, is_deleted=False).update(
+            is_deleted=True
+        )
+
+        for category in [*merged, target]:
+            bump_category_version(category)
+    return moved, deleted
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:07
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('category', '0003_alter_category_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='category',
+            index=models.Index(models.F('user'), django.db.models.functions.text.Lower('name'), condition=models.Q(('is_deleted', False)), name='category_user_lower_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='category',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', 'name', 'id'], name='category_user_name_live_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='category',
+            index=models.Index(condition=models.Q(('is_default', True), ('is_deleted', False)), fields=['name', 'id'], name='category_default_live_idx'),
+        ),
+    ]
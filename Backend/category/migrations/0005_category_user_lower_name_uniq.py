@@ -0,0 +1,39 @@
+import django.db.models.functions.text
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Postgres enforces the expression constraint with a unique index, so it
+    is built concurrently here and only recorded as a constraint in the
+    migration state. Fails if live duplicate names already exist.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('category', '0004_live_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql='CREATE UNIQUE INDEX CONCURRENTLY "category_user_lower_name_uniq" '
+                    'ON "category_category" ("user_id", (LOWER("name"))) WHERE NOT "is_deleted"',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "category_user_lower_name_uniq"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='category',
+                    constraint=models.UniqueConstraint(models.F('user'), django.db.models.functions.text.Lower('name'), condition=models.Q(('is_deleted', False)), name='category_user_lower_name_uniq'),
+                ),
+            ],
+        ),
+        RemoveIndexConcurrently(
+            model_name='category',
+            name='category_user_lower_name_idx',
+        ),
+    ]
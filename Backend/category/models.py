@@ -1,11 +1,17 @@
 import uuid
 from django.db import models
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from user.models import User
 
 # from django.db.models.signals import pre_delete
 # from django.dispatch import receiver
 
 
+UNIQUE_NAME_CONSTRAINT = "category_user_lower_name_uniq"
+
+
 class Category(models.Model):
     """Creating table of Category"""
 
@@ -21,10 +27,57 @@ class Category(models.Model):
     is_default = models.BooleanField(default=False)
     is_deleted = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            # A user's live category names are unique, case-insensitively
+            models.UniqueConstraint(
+                models.F("user"),
+                Lower("name"),
+                condition=models.Q(is_deleted=False),
+                name=UNIQUE_NAME_CONSTRAINT,
+            ),
+        ]
+        indexes = [
+            # A user's own categories, in list order
+            models.Index(
+                fields=["user", "name", "id"],
+                condition=models.Q(is_deleted=False),
+                name="category_user_name_live_idx",
+            ),
+            # Default categories shared by every user, in list order
+            models.Index(
+                fields=["name", "id"],
+                condition=models.Q(is_default=True, is_deleted=False),
+                name="category_default_live_idx",
+            ),
+        ]
+
     def __str__(self):
         return str(self.name)
 
 
+@receiver(pre_save, sender=Category)
+def handle_category_pre_save(sender, instance, **kwargs):
+    # The row being overwritten, so the owner or default flag it had is
+    # refreshed too if the save changes them
+    instance._previous = None
+    if not instance._state.adding:
+        instance._previous = Category.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def handle_category_changed(sender, instance, **kwargs):
+    # Covers every save, including the admin and shell where defaults are
+    # managed; bulk .update() callers still bump explicitly
+    from .cache import bump_category_version
+
+    bump_category_version(instance)
+    previous = getattr(instance, "_previous", None)
+    if previous is not None:
+        bump_category_version(previous)
+
+
 # @receiver(pre_delete, sender=User)
 # def handle_user_pre_delete(sender, instance, **kwargs):
 #     if instance.is_staff:
@@ -1,5 +1,7 @@
+from django.db import IntegrityError
+from django.db.transaction import atomic
 from rest_framework import serializers
-from .models import Category
+from .models import UNIQUE_NAME_CONSTRAINT, Category
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -13,17 +15,22 @@ class CategorySerializer(serializers.ModelSerializer):
             "is_default": {"read_only": True},  # Prevent non-admin users from modifying
         }
 
-    def validate_name(self, value):
-        user = self.context["request"].user
-
-        # Check if a category with the same name exists for the user
-        if Category.objects.filter(
-            name__iexact=value, user=user, is_deleted=False
-        ).exists():
+    def save(self, **kwargs):
+        # Names are unique per user, case-insensitively, through the
+        # category_user_lower_name_uniq constraint rather than a pre-check
+        try:
+            with atomic():
+                return super().save(**kwargs)
+        except IntegrityError as e:
+            if UNIQUE_NAME_CONSTRAINT not in str(e):
+                raise
             raise serializers.ValidationError(
-                "A category with this name already exists for this user. Names are case-insensitive."
+                {
+                    "name": [
+                        "A category with this name already exists for this user. Names are case-insensitive."
+                    ]
+                }
             )
-        return value
 
     def create(self, validated_data):
         # Enforce the authenticated user as the owner of the category
@@ -45,3 +52,12 @@ class CategorySerializer(serializers.ModelSerializer):
             validated_data.pop("is_default")
 
         return super().update(instance, validated_data)
+
+
+class CategoryStatsSerializer(serializers.Serializer):
+    """Usage statistics added to each category by `?with_stats=1`."""
+
+    transaction_count = serializers.IntegerField(default=0)
+    income_total = serializers.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expense_total = serializers.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_used = serializers.DateTimeField(default=None)
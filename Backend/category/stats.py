@@ -0,0 +1,35 @@
+"""Per-category usage statistics for the category list"""
+
+from django.db.models import Count, Max, Q, Sum
+
+from transaction.filters import filter_transactions
+from transaction.models import Transaction
+
+
+def usage_stats(user, category_ids, params):
+    """
+    Return `category_id -> {transaction_count, income_total, expense_total,
+    last_used}` for the user's transactions in the given categories,
+    optionally limited to the `start`/`end` dates in `params`. One grouped
+    query covers all the categories.
+    """
+    if not category_ids:
+        return {}
+
+    transactions = filter_transactions(
+        Transaction.objects.filter(
+            user=user, is_deleted=False, category_id__in=category_ids
+        ),
+        {name: params[name] for name in ("start", "end") if name in params},
+    )
+    rows = (
+        transactions.values("category_id")
+        .annotate(
+            transaction_count=Count("id"),
+            income_total=Sum("amount", filter=Q(transaction_type="income"), default=0),
+            expense_total=Sum("amount", filter=Q(transaction_type="expense"), default=0),
+            last_used=Max("date"),
+        )
+        .order_by()
+    )
+    return {row.pop("category_id"): row for row in rows}
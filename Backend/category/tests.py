@@ -1,3 +1,98 @@
-from django.test import TestCase
+from unittest import skipUnless
 
-# Create your tests here.
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Lower
+from django.test import TestCase, override_settings
+
+from user.models import User
+from .cache import get_category_set
+from .models import UNIQUE_NAME_CONSTRAINT, Category
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are Postgres-specific")
+class CategoryIndexTests(TestCase):
+    """The live-row category queries are served by their partial indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            User.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="pw98765!xyz"
+            )
+            for i in range(20)
+        ]
+        Category.objects.bulk_create(
+            Category(
+                user=users[i % len(users)],
+                name=f"Category {i}",
+                is_deleted=i % 10 == 0,
+            )
+            for i in range(2000)
+        )
+        cls.user = users[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE category_category")
+
+    def setUp(self):
+        # The seeded table is still small; make sure a usable index wins
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def test_list_uses_live_index(self):
+        queryset = Category.objects.filter(user=self.user, is_deleted=False).order_by(
+            "name", "id"
+        )[:6]
+        self.assertIn("category_user_name_live_idx", queryset.explain())
+
+    def test_lower_name_lookup_uses_unique_index(self):
+        queryset = Category.objects.alias(lower_name=Lower("name")).filter(
+            user=self.user, is_deleted=False, lower_name=Lower(Value("category 20"))
+        )
+        self.assertIn(UNIQUE_NAME_CONSTRAINT, queryset.explain())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CategorySetCacheTests(TestCase):
+    """Category writes outside the API still refresh the cached sets."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="user", email="user@example.com", password="pw98765!xyz"
+        )
+
+    def names(self):
+        return {category["name"] for category in get_category_set(self.user.id).values()}
+
+    def test_default_created_through_orm_reaches_every_user(self):
+        self.assertEqual(self.names(), set())
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Rent", is_default=True)
+
+        self.assertEqual(self.names(), {"Rent"})
+
+    def test_default_that_is_unset_leaves_every_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name="Rent", is_default=True)
+        self.assertEqual(self.names(), {"Rent"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.is_default = False
+            category.save()
+
+        self.assertEqual(self.names(), set())
+
+    def test_deleted_default_leaves_every_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name="Rent", is_default=True)
+        self.assertEqual(self.names(), {"Rent"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+
+        self.assertEqual(self.names(), set())
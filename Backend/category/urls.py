@@ -1,8 +1,9 @@
 from django.urls import path
 
-from .views import CategoryCRUDView
+from .views import CategoryCRUDView, CategoryMergeView
 
 urlpatterns = [
     path("", CategoryCRUDView.as_view(), name="category-list-create"),
+    path("merge/", CategoryMergeView.as_view(), name="category-merge"),
     path("<uuid:id>/", CategoryCRUDView.as_view(), name="category-get-update-delete"),
 ]
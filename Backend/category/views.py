@@ -1,12 +1,37 @@
+from uuid import UUID
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from .cache import get_category_set
+from .merge import merge_categories
 from .models import Category
 from rest_framework import status
-from .serializers import CategorySerializer
-from rest_framework.pagination import PageNumberPagination
+from .serializers import CategorySerializer, CategoryStatsSerializer
+from .stats import usage_stats
+from expense_tracker.pagination import KeysetPagination
+from expense_tracker.versions import DEFAULTS, version_etag
+
+
+class CategoryPagination(KeysetPagination):
+    ordering = ("name", "id")
+
+
+def with_stats(request):
+    return request.query_params.get("with_stats") in ("1", "true")
+
+
+def category_versions(request, id=None):
+    # Staff can read every user's categories; their responses are not tagged
+    if request.user.is_staff:
+        return None
+    versions = [("categories", request.user.id), ("categories", DEFAULTS)]
+    if with_stats(request):
+        versions.append(("transactions", request.user.id))
+    return versions
 
 
 class CategoryCRUDView(APIView):
+    @version_etag(category_versions)
     def get(self, request, id=None):
         """
         Handle retrieving categories. If an 'id' is provided, return details of a single category.
@@ -38,26 +63,40 @@ class CategoryCRUDView(APIView):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-        # For staff, fetch all categories; others get only their own
-        if request.user.is_staff:
-            categories = Category.objects.filter(is_deleted=False)
-        else:
-            categories = Category.objects.filter(
-                user=request.user, is_deleted=False
-            ) | Category.objects.filter(is_default=True, is_deleted=False)
-
         if request.user.is_deleted and not request.user.is_staff:
             return Response(
                 {"detail": "User is marked as deleted. Access denied."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        paginator = PageNumberPagination()
-        paginator.page_size = 5
-        paginated_categories = paginator.paginate_queryset(categories, request)
-        serializer = CategorySerializer(paginated_categories, many=True)
+        paginator = CategoryPagination()
+        # For staff, fetch all categories; others get their own and the
+        # defaults from the cached category set
+        if request.user.is_staff:
+            categories = Category.objects.filter(is_deleted=False)
+            paginated_categories = paginator.paginate_queryset(categories, request)
+        else:
+            categories = [
+                category
+                for category in get_category_set(request.user.id).values()
+                if not category["is_deleted"]
+            ]
+            paginated_categories = paginator.paginate_list(categories, request)
+        data = CategorySerializer(paginated_categories, many=True).data
+
+        if with_stats(request):
+            # Usage over the `start`/`end` dates, in one grouped query
+            stats = usage_stats(
+                request.user,
+                [category["id"] for category in data],
+                request.query_params,
+            )
+            for category in data:
+                category.update(
+                    CategoryStatsSerializer(stats.get(UUID(category["id"]), {})).data
+                )
 
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(data)
 
     def post(self, request):
         """Create a new category for the authenticated user."""
@@ -160,3 +199,18 @@ class CategoryCRUDView(APIView):
                 {"detail": f"An error occurred: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class CategoryMergeView(APIView):
+    def post(self, request):
+        """
+        Move every transaction of the `sources` categories to `target` and
+        soft-delete the sources.
+        """
+        moved, deleted = merge_categories(
+            request.user, request.data.get("sources"), request.data.get("target")
+        )
+        return Response(
+            {"transactions_moved": moved, "categories_deleted": deleted},
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,144 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique tuple of ordering fields.
+
+    Each page filters on the last row of the previous one instead of using
+    OFFSET, so deep pages cost the same as the first. Clients choose the
+    page size with `page_size` (capped at `max_page_size`) and can skip the
+    COUNT(*) query with `count=false`.
+    """
+
+    ordering = ()
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = queryset.count() if self.include_count(request) else None
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(position))
+            except (TypeError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def paginate_list(self, items, request, view=None):
+        """
+        Paginate an already sorted list of dicts or objects, e.g. one read
+        from the cache, with the same cursors and page sizes.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = len(items) if self.include_count(request) else None
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            items = [item for item in items if self.sorts_after(item, position)]
+
+        self.has_next = len(items) > self.page_size
+        self.page = items[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response["count"] = self.count
+        response["next"] = self.get_next_link()
+        response["results"] = data
+        return Response(response)
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def include_count(self, request):
+        value = request.query_params.get(self.count_query_param, "true")
+        return value.lower() not in ("0", "false", "no")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [
+            self._get_value(last, field.lstrip("-")) for field in self.ordering
+        ]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position)
+        )
+
+    def after(self, position):
+        """Build the WHERE clause selecting rows that sort after `position`."""
+        condition = Q()
+        for field, value in reversed(list(zip(self.ordering, position))):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            strictly_after = Q(**{f"{name}__{lookup}": value})
+            if condition:
+                condition = strictly_after | (Q(**{name: value}) & condition)
+            else:
+                condition = strictly_after
+        return condition
+
+    def sorts_after(self, item, position):
+        """Python counterpart of `after` for one item of a sorted list."""
+        for field, value in zip(self.ordering, position):
+            current = self._get_value(item, field.lstrip("-"))
+            if current != value:
+                return current < value if field.startswith("-") else current > value
+        return False
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position).encode("utf-8")
+        return urlsafe_b64encode(payload).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Positions are built from `_get_value`, which only returns strings
+        if not all(isinstance(value, str) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def _get_value(self, item, name):
+        value = item[name] if isinstance(item, dict) else getattr(item, name)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
@@ -103,6 +103,71 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"{REDIS_URL}/1",
+        "KEY_PREFIX": "expense_tracker",
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    },
+    # Notes are stored in Redis itself and used directly through
+    # django_redis.get_redis_connection("notes"), not the cache API
+    "notes": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.environ.get("NOTES_REDIS_URL", f"{REDIS_URL}/0"),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SOCKET_CONNECT_TIMEOUT": 2,
+            "SOCKET_TIMEOUT": 2,
+            "CONNECTION_POOL_KWARGS": {
+                "max_connections": int(os.environ.get("NOTES_REDIS_MAX_CONNECTIONS", 50)),
+                "health_check_interval": 30,
+                "retry_on_timeout": True,
+                "retry": Retry(ExponentialBackoff(cap=0.5, base=0.05), retries=3),
+                "decode_responses": True,
+            },
+        },
+    },
+}
+
+# Run the notes store against an in-process fake Redis (needs `fakeredis[lua]`
+# from requirements-dev.txt),
+# e.g. for tests and local runs without a Redis server
+if os.environ.get("NOTES_FAKE_REDIS") == "1":
+    from fakeredis import FakeConnection
+
+    CACHES["notes"]["OPTIONS"]["CONNECTION_POOL_KWARGS"]["connection_class"] = FakeConnection
+
+
+# Celery
+# https://docs.celeryq.dev/en/stable/django/first-steps-with-django.html
+
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", f"{REDIS_URL}/2")
+CELERY_TASK_IGNORE_RESULT = True
+# Run tasks inline (no broker or worker needed), e.g. for tests and local runs
+CELERY_TASK_ALWAYS_EAGER = os.environ.get("CELERY_TASK_ALWAYS_EAGER") == "1"
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BEAT_SCHEDULE = {
+    "purge-expired-tokens": {
+        "task": "user.tasks.purge_expired_tokens",
+        "schedule": 60 * 60,
+    },
+}
+
+# How long finished report jobs stay available
+REPORT_JOB_TTL = 60 * 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -149,15 +214,27 @@ AUTH_USER_MODEL = "user.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
         "user.authentication.CustomTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # Reverse proxies in front of the app that append to X-Forwarded-For.
+    # With 0 the client address is REMOTE_ADDR and the header, which
+    # clients can set freely, is ignored (e.g. by the login throttle).
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
 
 
+# How long an authenticated user is served from the cache
+AUTH_USER_CACHE_TTL = 60
+
+# Login token buckets per scope: (capacity, refill rate in tokens per second)
+LOGIN_THROTTLE_BUCKETS = {
+    "ip": (20, 20 / 60),
+    "username": (10, 10 / 600),
+}
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -168,6 +245,25 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Okta OpenID Connect login. The client is only set up on the first Okta
+# login; point OKTA_METADATA_URL at a stub OIDC server for local testing.
+OKTA_CLIENT_ID = os.environ.get("CLIENT_ID")
+OKTA_CLIENT_SECRET = os.environ.get("CLIENT_SECRET")
+OKTA_DOMAIN = os.environ.get("OKTA_DOMAIN", "integrator-9568283.okta.com")
+OKTA_METADATA_URL = os.environ.get(
+    "OKTA_METADATA_URL",
+    f"https://{OKTA_DOMAIN}/oauth2/default/.well-known/openid-configuration",
+)
+# How long the discovery document and signing keys are cached
+OKTA_METADATA_TTL = 60 * 60
+
+# Sessions (only used for the OAuth state during Okta login) live in the cache
+SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://localhost:3000",
@@ -0,0 +1,11 @@
+"""Small helpers shared by the apps"""
+
+import uuid
+
+
+def as_uuid(value):
+    """Parse `value` as a UUID, or return None if it is not one."""
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
@@ -0,0 +1,78 @@
+"""
+Per-user data versions kept in the cache.
+
+Derived data (cached aggregates, ETags) embeds the current version in its
+cache key; writers bump the version once their database transaction
+commits, so stale entries are never read again and simply expire.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.transaction import on_commit
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+DEFAULTS = "defaults"
+
+
+def _key(namespace, owner):
+    return f"version:{namespace}:{owner}"
+
+
+def get_versions(*pairs):
+    """
+    Return the current version for each `(namespace, owner)` pair, in order.
+    Missing versions start from the current time so a version key evicted
+    from the cache never repeats an older value.
+    """
+    keys = [_key(namespace, owner) for namespace, owner in pairs]
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    for key, value in missing.items():
+        if not cache.add(key, value, timeout=None):
+            missing[key] = cache.get(key, value)
+    found.update(missing)
+    return tuple(found[key] for key in keys)
+
+
+def get_version(namespace, owner):
+    return get_versions((namespace, owner))[0]
+
+
+def bump_version(namespace, owner):
+    """Invalidate data derived from `namespace` once the current transaction commits."""
+
+    def bump():
+        key = _key(namespace, owner)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+    on_commit(bump)
+
+
+def version_etag(depends_on):
+    """
+    Add conditional GET support to an APIView method. `depends_on(request,
+    *args, **kwargs)` returns the `(namespace, owner)` pairs the response is
+    derived from, or None to skip. The ETag hashes their versions with the
+    user, path and media type, so a matching If-None-Match is answered with
+    304 before the view touches the database.
+    """
+
+    def etag(request, *args, **kwargs):
+        pairs = depends_on(request, *args, **kwargs)
+        if pairs is None:
+            return None
+        parts = [
+            str(request.user.pk),
+            request.get_full_path(),
+            getattr(request, "accepted_media_type", ""),
+            *(str(version) for version in get_versions(*pairs)),
+        ]
+        return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+    return method_decorator(condition(etag_func=etag))
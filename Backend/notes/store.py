@@ -0,0 +1,302 @@
+"""
+Redis storage for notes.
+
+Each user's notes are JSON values in a hash keyed by note id, with a
+sorted set indexing the ids by creation time, one set of note ids per
+search term and a set of the terms in use. Writes touch all of them in
+one MULTI/EXEC or script call, and lists read one page of ids from the sorted set before
+fetching just those notes with HMGET.
+"""
+
+import json
+import re
+import uuid
+from datetime import datetime
+
+from django_redis import get_redis_connection
+
+# Bumped when the layout of the indexes changes, so they are rebuilt
+INDEX_VERSION = "1"
+
+# Fields that are searchable
+INDEXED_FIELDS = ("title", "content")
+
+# Longest query accepted by `search`, in terms
+MAX_QUERY_TERMS = 10
+
+# ASCII letters and digits, matching Lua's "%w" in the scripts below
+TERM = re.compile(r"[A-Za-z0-9]+")
+
+
+def client():
+    """The pooled connection configured as CACHES["notes"] in settings."""
+    return get_redis_connection("notes")
+
+
+def notes_key(user_id):
+    return f"user:{user_id}:notes"
+
+
+def index_key(user_id):
+    return f"user:{user_id}:notes:created"
+
+
+def version_key(user_id):
+    return f"user:{user_id}:notes:indexed"
+
+
+def term_prefix(user_id):
+    return f"user:{user_id}:notes:term:"
+
+
+def terms_key(user_id):
+    """The terms that have a non-empty set, so they can be found without SCAN."""
+    return f"user:{user_id}:notes:terms"
+
+
+def score(created_at):
+    """Sort score of a note: its `created_at` in integer microseconds."""
+    return round(datetime.fromisoformat(created_at).timestamp() * 1_000_000)
+
+
+def tokenize(text):
+    """The distinct lowercase terms of `text`, in order of appearance."""
+    return list(dict.fromkeys(term.lower() for term in TERM.findall(text)))
+
+
+def terms(note):
+    """Every term indexed for a note."""
+    return {
+        term
+        for field in INDEXED_FIELDS
+        if isinstance(note.get(field), str)
+        for term in tokenize(note[field])
+    }
+
+
+def get(user_id, note_id):
+    note = client().hget(notes_key(user_id), note_id)
+    return json.loads(note) if note else None
+
+
+def create(user_id, note):
+    prefix = term_prefix(user_id)
+    note_terms = terms(note)
+    with client().pipeline() as pipe:
+        pipe.hset(notes_key(user_id), note["id"], json.dumps(note))
+        pipe.zadd(index_key(user_id), {note["id"]: score(note["created_at"])})
+        for term in note_terms:
+            pipe.sadd(prefix + term, note["id"])
+        if note_terms:
+            pipe.sadd(terms_key(user_id), *note_terms)
+        pipe.execute()
+
+
+# Lua counterpart of `terms`: adds the terms of a decoded note to `into`.
+# `unindex` removes a note from a term set, and the term from the set of
+# terms in use once no note has it.
+TERMS = """
+local function terms(note, into)
+    for _, field in ipairs({"title", "content"}) do
+        if type(note[field]) == "string" then
+            for term in string.gmatch(string.lower(note[field]), "%w+") do
+                into[term] = true
+            end
+        end
+    end
+    return into
+end
+
+local function unindex(prefix, used, term, id)
+    redis.call("SREM", prefix .. term, id)
+    if redis.call("EXISTS", prefix .. term) == 0 then
+        redis.call("SREM", used, term)
+    end
+end
+"""
+
+# Merges the JSON object in ARGV[2] into the note ARGV[1] of hash KEYS[1],
+# moves the note between the term sets prefixed ARGV[3] whose terms it
+# lost or gained, keeping the terms in use in KEYS[2], and returns the
+# merged note, or nil if it does not exist
+UPDATE_NOTE = TERMS + """
+local note = redis.call("HGET", KEYS[1], ARGV[1])
+if not note then
+    return nil
+end
+note = cjson.decode(note)
+local before = terms(note, {})
+for field, value in pairs(cjson.decode(ARGV[2])) do
+    note[field] = value
+end
+local after = terms(note, {})
+for term in pairs(before) do
+    if not after[term] then
+        unindex(ARGV[3], KEYS[2], term, ARGV[1])
+    end
+end
+for term in pairs(after) do
+    if not before[term] then
+        redis.call("SADD", ARGV[3] .. term, ARGV[1])
+        redis.call("SADD", KEYS[2], term)
+    end
+end
+note = cjson.encode(note)
+redis.call("HSET", KEYS[1], ARGV[1], note)
+return note
+"""
+
+# Removes the note ARGV[1] from hash KEYS[1], sorted set KEYS[2] and the
+# term sets prefixed ARGV[2], keeping the terms in use in KEYS[3]; returns
+# 1 if it existed, 0 otherwise
+DELETE_NOTE = TERMS + """
+local note = redis.call("HGET", KEYS[1], ARGV[1])
+if not note then
+    return 0
+end
+for term in pairs(terms(cjson.decode(note), {})) do
+    unindex(ARGV[2], KEYS[3], term, ARGV[1])
+end
+redis.call("HDEL", KEYS[1], ARGV[1])
+redis.call("ZREM", KEYS[2], ARGV[1])
+return 1
+"""
+
+
+def update(user_id, note_id, changes):
+    """
+    Merge `changes` into a stored note and return the result, or None if
+    the note does not exist. The merge and the term index update run
+    server-side as one atomic script call (EVALSHA), so concurrent edits
+    of different fields are all kept.
+    """
+    connection = client()
+    note = connection.register_script(UPDATE_NOTE)(
+        keys=[notes_key(user_id), terms_key(user_id)],
+        args=[note_id, json.dumps(changes), term_prefix(user_id)],
+    )
+    return json.loads(note) if note else None
+
+
+def delete(user_id, note_id):
+    """Delete a note; returns whether it existed."""
+    connection = client()
+    deleted = connection.register_script(DELETE_NOTE)(
+        keys=[notes_key(user_id), index_key(user_id), terms_key(user_id)],
+        args=[note_id, term_prefix(user_id)],
+    )
+    return bool(deleted)
+
+
+def reindex(user_id):
+    """Rebuild a user's creation-time and term indexes from the notes hash."""
+    connection = client()
+    prefix = term_prefix(user_id)
+    with connection.pipeline() as pipe:
+        pipe.hgetall(notes_key(user_id))
+        pipe.smembers(terms_key(user_id))
+        notes, stale = pipe.execute()
+    notes = {note_id: json.loads(note) for note_id, note in notes.items()}
+
+    postings = {}
+    for note_id, note in notes.items():
+        for term in terms(note):
+            postings.setdefault(term, []).append(note_id)
+
+    with connection.pipeline() as pipe:
+        pipe.delete(
+            index_key(user_id), terms_key(user_id), *(prefix + term for term in stale)
+        )
+        if notes:
+            pipe.zadd(
+                index_key(user_id),
+                {note_id: score(note["created_at"]) for note_id, note in notes.items()},
+            )
+        for term, note_ids in postings.items():
+            pipe.sadd(prefix + term, *note_ids)
+        if postings:
+            pipe.sadd(terms_key(user_id), *postings)
+        pipe.set(version_key(user_id), INDEX_VERSION)
+        pipe.execute()
+
+
+def is_stale(total, indexed, version):
+    """
+    Whether a user's indexes need a rebuild: notes from before the
+    indexes existed are missing from them, and the version key is unset
+    or older than INDEX_VERSION.
+    """
+    return total != indexed or version != INDEX_VERSION
+
+
+def page(user_id, after, count):
+    """
+    Return up to `count` notes, newest first, following the `after`
+    position (`created_at`, `id`) of the previous page, and the total
+    number of notes. Notes from before the index existed are indexed on
+    first use.
+    """
+    connection = client()
+    index = index_key(user_id)
+    with connection.pipeline() as pipe:
+        pipe.hlen(notes_key(user_id))
+        pipe.zcard(index)
+        pipe.get(version_key(user_id))
+        if after is None:
+            pipe.zrevrangebyscore(index, "+inf", "-inf", start=0, num=count)
+        else:
+            after_score = score(after[0])
+            # Notes created in the same microsecond as the cursor
+            pipe.zrevrangebyscore(index, after_score, after_score)
+            pipe.zrevrangebyscore(index, f"({after_score}", "-inf", start=0, num=count)
+        total, indexed, version, *ranges = pipe.execute()
+
+    if is_stale(total, indexed, version):
+        reindex(user_id)
+        return page(user_id, after, count)
+
+    if after is None:
+        ids = ranges[0]
+    else:
+        ids = [note_id for note_id in ranges[0] if note_id < after[1]] + ranges[1]
+    ids = ids[:count]
+    if not ids:
+        return [], total
+    notes = connection.hmget(notes_key(user_id), ids)
+    return [json.loads(note) for note in notes if note], total
+
+
+def search(user_id, query, count):
+    """
+    Return up to `count` notes containing every term of `query`, newest
+    first, and the number of matching notes.
+
+    The term sets are intersected together with the creation-time index
+    in one ZINTERSTORE whose set weights are 0, so the matches keep their
+    creation scores and only the newest page of ids leaves Redis.
+    """
+    query_terms = tokenize(query)[:MAX_QUERY_TERMS]
+    if not query_terms:
+        return [], 0
+
+    connection = client()
+    result = f"user:{user_id}:notes:search:{uuid.uuid4()}"
+    weights = {index_key(user_id): 1}
+    weights.update({term_prefix(user_id) + term: 0 for term in query_terms})
+    with connection.pipeline() as pipe:
+        pipe.hlen(notes_key(user_id))
+        pipe.zcard(index_key(user_id))
+        pipe.get(version_key(user_id))
+        pipe.zinterstore(result, weights)
+        pipe.zrevrange(result, 0, count - 1)
+        pipe.delete(result)
+        total, indexed, version, matches, ids, _ = pipe.execute()
+
+    if is_stale(total, indexed, version):
+        reindex(user_id)
+        return search(user_id, query, count)
+
+    if not ids:
+        return [], matches
+    notes = connection.hmget(notes_key(user_id), ids)
+    return [json.loads(note) for note in notes if note], matches
@@ -1,3 +1,65 @@
-from django.test import TestCase
+import json
+from copy import deepcopy
 
-# Create your tests here.
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from fakeredis import FakeConnection
+
+from . import store
+
+# The notes cache as NOTES_FAKE_REDIS=1 configures it, under its own URL so
+# django-redis does not hand back a pool made for a real server
+FAKE_REDIS_CACHES = deepcopy(settings.CACHES)
+FAKE_REDIS_CACHES["notes"]["LOCATION"] = "redis://notes-tests:6379/0"
+FAKE_REDIS_CACHES["notes"]["OPTIONS"]["CONNECTION_POOL_KWARGS"][
+    "connection_class"
+] = FakeConnection
+
+
+def note(title, content="", created_at="2026-01-01T00:00:00+00:00"):
+    return {
+        "id": title,
+        "title": title,
+        "content": content,
+        "created_at": created_at,
+    }
+
+
+@override_settings(CACHES=FAKE_REDIS_CACHES)
+class NoteStoreTests(SimpleTestCase):
+    """The store, Lua scripts included, runs against the fake Redis."""
+
+    def setUp(self):
+        store.client().flushdb()
+
+    def test_search_follows_updates_and_deletes(self):
+        store.create(1, note("groceries", "milk and eggs"))
+        store.create(1, note("rent", "march", "2026-02-01T00:00:00+00:00"))
+        store.create(2, note("milk"))
+
+        self.assertEqual(store.search(1, "milk", 10), ([store.get(1, "groceries")], 1))
+
+        updated = store.update(1, "groceries", {"content": "bread"})
+        self.assertEqual(updated["content"], "bread")
+        self.assertEqual(store.search(1, "milk", 10), ([], 0))
+        self.assertEqual(store.search(1, "bread", 10), ([updated], 1))
+
+        self.assertTrue(store.delete(1, "groceries"))
+        self.assertFalse(store.delete(1, "groceries"))
+        self.assertEqual(store.search(1, "bread", 10), ([], 0))
+        self.assertEqual(
+            store.client().smembers(store.terms_key(1)), {"rent", "march"}
+        )
+
+    def test_page_indexes_notes_stored_before_the_index(self):
+        for day in (1, 2, 3):
+            created = note(f"note{day}", created_at=f"2026-01-0{day}T00:00:00+00:00")
+            store.client().hset(store.notes_key(1), created["id"], json.dumps(created))
+
+        notes, total = store.page(1, None, 2)
+        self.assertEqual([n["id"] for n in notes], ["note3", "note2"])
+        self.assertEqual(total, 3)
+
+        last = notes[-1]
+        notes, _ = store.page(1, (last["created_at"], last["id"]), 2)
+        self.assertEqual([n["id"] for n in notes], ["note1"])
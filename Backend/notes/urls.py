@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import NotesCRUDView
+from .views import NotesCRUDView, NotesSearchView
 
 urlpatterns = [
+    # Handle GET (search)
+    path("search/", NotesSearchView.as_view(), name="note-search"),
+
     # Handle GET (single), PUT, and DELETE
     path("<uuid:id>/", NotesCRUDView.as_view(), name="note-detail"),
     
@@ -1,36 +1,48 @@
-import redis
-import json
 import uuid
 from datetime import datetime
-from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import NotFound
+from expense_tracker.pagination import KeysetPagination
+from . import store
 from .serializers import NoteSerializer
 
-# Connect to Redis using the service name from docker-compose
-r = redis.Redis(host='redis', port=6379, db=0, decode_responses=True)
 
-class NotesCRUDView(APIView):
-    def get_user_key(self, user_id):
-        return f"user:{user_id}:notes"
+class NotesPagination(KeysetPagination):
+    """Keyset pages over the notes' creation-time index in Redis."""
+
+    ordering = ("-created_at", "-id")
+
+    def paginate_notes(self, user_id, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                store.score(position[0])
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        notes, total = store.page(user_id, position, self.page_size + 1)
+        self.count = total if self.include_count(request) else None
+        self.has_next = len(notes) > self.page_size
+        self.page = notes[: self.page_size]
+        return self.page
 
+
+class NotesCRUDView(APIView):
     def get(self, request, id=None):
-        user_key = self.get_user_key(request.user.id)
-        
         if id:
-            note_data = r.hget(user_key, id)
-            if not note_data:
+            note = store.get(request.user.id, str(id))
+            if not note:
                 return Response({"detail": "Note not found"}, status=status.HTTP_404_NOT_FOUND)
-            return Response(json.loads(note_data))
+            return Response(note)
 
-        # Fetch all notes from the Hash
-        all_notes_raw = r.hgetall(user_key)
-        all_notes = [json.loads(v) for v in all_notes_raw.values()]
-        
-        # Sort by date (since Redis Hashes aren't ordered)
-        all_notes.sort(key=lambda x: x['created_at'], reverse=True)
-        return Response(all_notes)
+        # Newest first, one page at a time from the creation-time index
+        paginator = NotesPagination()
+        notes = paginator.paginate_notes(request.user.id, request)
+        return paginator.get_paginated_response(notes)
 
     def post(self, request):
         serializer = NoteSerializer(data=request.data)
@@ -41,33 +53,45 @@ class NotesCRUDView(APIView):
                 **serializer.validated_data,
                 "created_at": datetime.now().isoformat()
             }
-            
-            user_key = self.get_user_key(request.user.id)
-            r.hset(user_key, note_id, json.dumps(note_data))
-            
+
+            store.create(request.user.id, note_data)
+
             return Response(note_data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def put(self, request, id=None):
-        user_key = self.get_user_key(request.user.id)
-        note_data_raw = r.hget(user_key, id)
-        
-        if not note_data_raw:
-            return Response({"detail": "Note not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        existing_note = json.loads(note_data_raw)
         serializer = NoteSerializer(data=request.data, partial=True)
-        
+
         if serializer.is_valid():
-            updated_note = {**existing_note, **serializer.validated_data}
-            r.hset(user_key, id, json.dumps(updated_note))
+            updated_note = store.update(
+                request.user.id, str(id), serializer.validated_data
+            )
+            if not updated_note:
+                return Response({"detail": "Note not found"}, status=status.HTTP_404_NOT_FOUND)
             return Response(updated_note)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, id=None):
-        user_key = self.get_user_key(request.user.id)
-        deleted = r.hdel(user_key, id)
-        
+        deleted = store.delete(request.user.id, str(id))
+
         if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response({"detail": "Note not found"}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        return Response({"detail": "Note not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class NotesSearchView(APIView):
+    def get(self, request):
+        """
+        Return the newest notes containing every term of `q`, up to
+        `page_size`, with the number of matching notes.
+        """
+        query = request.query_params.get("q", "")
+        if not store.tokenize(query):
+            return Response(
+                {"q": "Enter at least one letter or digit to search for."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        page_size = NotesPagination().get_page_size(request)
+        notes, count = store.search(request.user.id, query, page_size)
+        return Response({"count": count, "results": notes})
\ No newline at end of file
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Transaction, Category
+from .models import Transaction, Category, MonthlySummary
 
 # Register your models here.
 
 admin.site.register(Transaction)
 admin.site.register(Category)
+admin.site.register(MonthlySummary)
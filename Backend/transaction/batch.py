@@ -0,0 +1,155 @@
+"""Batch create/update/soft-delete of transactions in one database transaction"""
+
+from django.db.transaction import atomic
+from rest_framework.exceptions import ValidationError
+
+from category.cache import get_category_set
+from expense_tracker.utils import as_uuid
+from . import rollups
+from .models import Transaction
+from .serializers import TransactionSerializer
+
+MAX_OPERATIONS = 500
+ACTIONS = ("create", "update", "delete")
+
+
+class TransactionBatchItemSerializer(TransactionSerializer):
+    """
+    Validates one batch item against the category set loaded once for the
+    whole batch and passed in the context.
+    """
+
+    def get_categories(self):
+        return self.context["categories"]
+
+
+def _check_operation(operation, seen):
+    """Return an error dict for a structurally invalid operation, else None."""
+    if not isinstance(operation, dict) or operation.get("action") not in ACTIONS:
+        return {"action": [f"Expected one of: {', '.join(ACTIONS)}."]}
+    if operation["action"] != "delete" and not isinstance(operation.get("data"), dict):
+        return {"data": ["This field is required."]}
+    if operation["action"] == "create":
+        return None
+
+    transaction_id = as_uuid(operation.get("id"))
+    if transaction_id is None:
+        return {"id": ["A valid transaction id is required."]}
+    if transaction_id in seen:
+        return {"id": ["Transaction appears in more than one operation."]}
+    seen.add(transaction_id)
+    return None
+
+
+def apply_batch(user, operations):
+    """
+    Validate every operation, then apply them all in one database
+    transaction. Nothing is written if any operation is invalid.
+    Returns `(applied, results)` with one result per operation.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValidationError({"operations": "Provide a non-empty list of operations."})
+    if len(operations) > MAX_OPERATIONS:
+        raise ValidationError(
+            {"operations": f"At most {MAX_OPERATIONS} operations per batch."}
+        )
+
+    seen = set()
+    errors = [_check_operation(operation, seen) for operation in operations]
+    with atomic():
+        # Lock the targeted rows so their rollup contributions stay accurate
+        existing = (
+            Transaction.objects.select_for_update()
+            .filter(user=user, is_deleted=False, id__in=seen)
+            .in_bulk()
+        )
+        return _validate_and_apply(user, operations, errors, existing)
+
+
+def _validate_and_apply(user, operations, errors, existing):
+    context = {"categories": get_category_set(user.id)}
+
+    validated = []
+    for index, operation in enumerate(operations):
+        if errors[index]:
+            validated.append(None)
+            continue
+
+        action = operation["action"]
+        instance = None
+        if action != "create":
+            instance = existing.get(as_uuid(operation["id"]))
+            if instance is None:
+                errors[index] = {
+                    "id": ["Transaction not found or permission denied."]
+                }
+                validated.append(None)
+                continue
+        if action == "delete":
+            validated.append((action, instance, None))
+            continue
+
+        serializer = TransactionBatchItemSerializer(
+            instance,
+            data=operation["data"],
+            partial=action == "update",
+            context=context,
+        )
+        if serializer.is_valid():
+            validated.append((action, instance, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+            validated.append(None)
+
+    if any(errors):
+        return False, [
+            {"index": index, "errors": error}
+            for index, error in enumerate(errors)
+            if error
+        ]
+
+    return True, _apply(user, validated)
+
+
+def _apply(user, validated):
+    """Write validated operations; runs inside apply_batch's atomic block."""
+    created, updated, deleted = [], [], []
+    removed, added = [], []
+    update_fields = set()
+
+    for action, instance, data in validated:
+        if action == "create":
+            instance = Transaction(user=user, **data)
+            created.append(instance)
+            added.append(rollups.entry(instance))
+        elif action == "update":
+            removed.append(rollups.entry(instance))
+            for field, value in data.items():
+                setattr(instance, field, value)
+                update_fields.add(field)
+            updated.append(instance)
+            added.append(rollups.entry(instance))
+        else:
+            removed.append(rollups.entry(instance))
+            instance.is_deleted = True
+            deleted.append(instance)
+
+    Transaction.objects.bulk_create(created)
+    if updated and update_fields:
+        Transaction.objects.bulk_update(updated, sorted(update_fields))
+    if deleted:
+        Transaction.objects.filter(
+            id__in=[instance.id for instance in deleted]
+        ).update(is_deleted=True)
+    rollups.apply(removed=removed, added=added)
+
+    results = []
+    created_instances = iter(created)
+    for index, (action, instance, _) in enumerate(validated):
+        if action == "create":
+            instance = next(created_instances)
+        result = {"index": index, "action": action, "id": instance.id}
+        if action != "delete":
+            result["data"] = TransactionSerializer(instance).data
+        results.append(result)
+    return results
@@ -0,0 +1,78 @@
+"""Streaming serializers for transaction exports"""
+
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+EXPORT_FIELDS = (
+    "id",
+    "date",
+    "amount",
+    "transaction_type",
+    "category__name",
+    "description",
+)
+HEADER = ("id", "date", "amount", "transaction_type", "category", "description")
+
+CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+
+
+class Echo:
+    """File-like object that hands back what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset):
+    rows = queryset.order_by("date", "id").values_list(*EXPORT_FIELDS)
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        row = list(row)
+        row[1] = timezone.localtime(row[1]).isoformat()
+        yield row
+
+
+def csv_lines(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    for row in _rows(queryset):
+        yield writer.writerow(row)
+
+
+def ndjson_lines(queryset):
+    for row in _rows(queryset):
+        yield json.dumps(dict(zip(HEADER, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def encode(lines, compress=False):
+    """
+    Group lines into ~64KB byte chunks, optionally gzip-compressing them on
+    the fly, so the response is written in a few large pieces.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= FLUSH_BYTES:
+            chunk = b"".join(buffer)
+            buffer, size = [], 0
+            yield compressor.compress(chunk) if compressor else chunk
+
+    chunk = b"".join(buffer)
+    if compressor:
+        yield compressor.compress(chunk) + compressor.flush()
+    elif chunk:
+        yield chunk
+
+
+FORMATS = {
+    "csv": (csv_lines, "text/csv", "csv"),
+    "ndjson": (ndjson_lines, "application/x-ndjson", "ndjson"),
+}
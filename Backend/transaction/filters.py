@@ -0,0 +1,89 @@
+"""Query-param filtering for transaction querysets"""
+
+import uuid
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import Transaction
+from .reports import local_midnight
+
+TRANSACTION_TYPES = {value for value, _ in Transaction.TYPE_CHOICES}
+
+
+def _parse_day(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError({name: "Expected a date as YYYY-MM-DD."})
+    return day
+
+
+def _parse_amount(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        amount = None
+    if amount is None or not amount.is_finite():
+        raise ValidationError({name: "Expected a number."})
+    return amount
+
+
+def filter_transactions(queryset, params):
+    """
+    Narrow a transaction queryset with the supported query params:
+    `start`/`end` (inclusive local dates), `transaction_type`, `category`
+    (an id or "uncategorized"), `min_amount`/`max_amount` and `search`
+    (case-insensitive substring of the description).
+    """
+    start = _parse_day(params, "start")
+    end = _parse_day(params, "end")
+    if start and end and start > end:
+        raise ValidationError({"detail": "start must not be after end."})
+    if start:
+        queryset = queryset.filter(date__gte=local_midnight(start))
+    if end:
+        queryset = queryset.filter(date__lt=local_midnight(end + timedelta(days=1)))
+
+    transaction_type = params.get("transaction_type")
+    if transaction_type:
+        if transaction_type not in TRANSACTION_TYPES:
+            raise ValidationError(
+                {"transaction_type": "Expected 'income' or 'expense'."}
+            )
+        queryset = queryset.filter(transaction_type=transaction_type)
+
+    category = params.get("category")
+    if category == "uncategorized":
+        queryset = queryset.filter(category__isnull=True)
+    elif category:
+        try:
+            queryset = queryset.filter(category_id=uuid.UUID(category))
+        except ValueError:
+            raise ValidationError(
+                {"category": "Expected a category id or 'uncategorized'."}
+            )
+
+    min_amount = _parse_amount(params, "min_amount")
+    if min_amount is not None:
+        queryset = queryset.filter(amount__gte=min_amount)
+    max_amount = _parse_amount(params, "max_amount")
+    if max_amount is not None:
+        queryset = queryset.filter(amount__lte=max_amount)
+
+    search = params.get("search", "").strip()
+    if search:
+        # Compiles to UPPER(description) LIKE '%...%', served by the trigram index
+        queryset = queryset.filter(description__icontains=search)
+
+    return queryset
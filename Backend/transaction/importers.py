@@ -0,0 +1,231 @@
+"""Streaming parsers and batch loader for bulk transaction imports"""
+
+import csv
+import io
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.transaction import atomic
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from category.cache import get_category_set
+from . import rollups
+from .models import Transaction
+
+BATCH_SIZE = 500
+
+OFX_TAG = re.compile(r"<(/?)(\w+)>([^<\r\n]*)")
+
+# Set by parse_csv on rows with more fields than the header
+EXTRA_FIELDS = "__extra_fields__"
+
+
+class TransactionImportSerializer(serializers.Serializer):
+    """Validates a single imported row."""
+
+    date = serializers.DateTimeField(
+        required=False, input_formats=["iso-8601", "%Y-%m-%d", "%d/%m/%Y"]
+    )
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    transaction_type = serializers.ChoiceField(choices=Transaction.TYPE_CHOICES)
+    category = serializers.CharField(required=False, allow_blank=True)
+    description = serializers.CharField(required=False, allow_blank=True)
+
+    def to_internal_value(self, data):
+        # The columns of such a row are misaligned, so no field can be trusted
+        if data.get(EXTRA_FIELDS):
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "Row has more fields than the header."
+                    ]
+                }
+            )
+        return super().to_internal_value(data)
+
+
+class UnreadableRow(ValueError):
+    """A CSV row that is not valid UTF-8 or not valid CSV; row 0 is the header."""
+
+    def __init__(self, row, reason):
+        super().__init__(f"Row {row}: {reason}")
+        self.row = row
+        self.reason = reason
+
+
+NOT_UTF8 = "Not valid UTF-8 text. Save the file as UTF-8 and upload it again."
+
+
+def _is_utf8(values):
+    # Undecodable bytes are read as lone surrogates, which cannot be encoded
+    try:
+        "".join(values).encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def parse_csv(stream):
+    """
+    Yield rows from a CSV upload with a header row. Columns are matched
+    case-insensitively: date, amount, transaction_type (or type), category,
+    description. Rows with more non-empty fields than the header are
+    flagged with EXTRA_FIELDS. Raises UnreadableRow for the first row that
+    is not UTF-8 or not valid CSV.
+    """
+    reader = csv.DictReader(
+        io.TextIOWrapper(
+            stream, encoding="utf-8-sig", errors="surrogateescape", newline=""
+        )
+    )
+    try:
+        fieldnames = reader.fieldnames or []
+    except csv.Error as e:
+        raise UnreadableRow(0, str(e))
+    if not _is_utf8(fieldnames):
+        raise UnreadableRow(0, NOT_UTF8)
+
+    number = 0
+    try:
+        for number, row in enumerate(reader, start=1):
+            # DictReader collects the fields past the header in a list under None
+            extra = row.pop(None, None) or []
+            row = {
+                (key or "").strip().lower(): (value or "").strip()
+                for key, value in row.items()
+            }
+            if not _is_utf8([*row.values(), *extra]):
+                raise UnreadableRow(number, NOT_UTF8)
+            if "type" in row and "transaction_type" not in row:
+                row["transaction_type"] = row.pop("type")
+            row["transaction_type"] = row.get("transaction_type", "").lower()
+            row = {key: value for key, value in row.items() if value != ""}
+            # Trailing empty fields ("5,expense,") are harmless
+            if any(value.strip() for value in extra):
+                row[EXTRA_FIELDS] = True
+            yield row
+    except csv.Error as e:
+        raise UnreadableRow(number + 1, str(e))
+
+
+def parse_ofx(stream):
+    """
+    Yield rows from the STMTTRN blocks of an OFX/QFX statement. Handles both
+    the SGML (unclosed tags) and XML flavours, one line at a time.
+    """
+    current = None
+    for line in io.TextIOWrapper(stream, encoding="utf-8", errors="replace"):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    yield _ofx_row(current)
+                    current = None
+                elif not closing:
+                    current = {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+    if current is not None:
+        yield _ofx_row(current)
+
+
+def _ofx_row(fields):
+    row = {}
+    amount = fields.get("TRNAMT", "")
+    try:
+        value = Decimal(amount)
+        row["amount"] = str(abs(value))
+        row["transaction_type"] = "income" if value > 0 else "expense"
+    except InvalidOperation:
+        row["amount"] = amount
+
+    posted = fields.get("DTPOSTED", "")
+    try:
+        row["date"] = datetime.strptime(posted[:8], "%Y%m%d").date().isoformat()
+    except ValueError:
+        row["date"] = posted
+
+    description = " ".join(
+        value for value in (fields.get("NAME"), fields.get("MEMO")) if value
+    )
+    if description:
+        row["description"] = description
+    return row
+
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "qfx": parse_ofx}
+
+
+class CategoryResolver:
+    """
+    Resolves category names for one import from the cached category set;
+    the user's own categories win on name clashes.
+    """
+
+    def __init__(self, user):
+        self.ids = {}
+        categories = sorted(
+            get_category_set(user.id).values(),
+            key=lambda category: not category["is_default"],
+        )
+        for category in categories:
+            if not category["is_deleted"]:
+                self.ids[category["name"].lower()] = category["id"]
+
+    def resolve(self, name):
+        return self.ids.get(name.lower())
+
+
+def import_transactions(user, rows):
+    """
+    Validate `rows` in batches and bulk-create the valid ones inside a single
+    database transaction. Returns the number created and per-row errors.
+    """
+    resolver = CategoryResolver(user)
+    created = 0
+    errors = []
+    batch = []
+
+    def flush():
+        Transaction.objects.bulk_create(batch)
+        rollups.apply(added=[rollups.entry(transaction) for transaction in batch])
+        return len(batch)
+
+    with atomic():
+        for number, row in enumerate(rows, start=1):
+            serializer = TransactionImportSerializer(data=row)
+            if not serializer.is_valid():
+                errors.append({"row": number, "errors": serializer.errors})
+                continue
+
+            data = serializer.validated_data
+            category_id = None
+            if data.get("category"):
+                category_id = resolver.resolve(data["category"])
+                if category_id is None:
+                    errors.append(
+                        {"row": number, "errors": {"category": ["Unknown category."]}}
+                    )
+                    continue
+
+            batch.append(
+                Transaction(
+                    user=user,
+                    category_id=category_id,
+                    amount=data["amount"],
+                    date=data.get("date") or timezone.now(),
+                    description=data.get("description", ""),
+                    transaction_type=data["transaction_type"],
+                )
+            )
+            if len(batch) >= BATCH_SIZE:
+                created += flush()
+                batch = []
+
+        if batch:
+            created += flush()
+
+    return created, errors
@@ -0,0 +1,132 @@
+"""Long-range report jobs, computed by Celery workers and kept in the cache"""
+
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from rest_framework.exceptions import ValidationError
+
+from .models import MonthlySummary
+
+
+def yearly_summary(user_id, start_year, end_year):
+    """Income, expense and balance per year."""
+    rows = (
+        MonthlySummary.objects.filter(
+            user_id=user_id, year__gte=start_year, year__lte=end_year
+        )
+        .values("year", "transaction_type")
+        .annotate(total=Sum("total"), count=Sum("count"))
+        .order_by("year")
+    )
+    years = {}
+    for row in rows:
+        year = years.setdefault(
+            row["year"],
+            {
+                "year": row["year"],
+                "income": Decimal("0"),
+                "expense": Decimal("0"),
+                "count": 0,
+            },
+        )
+        year[row["transaction_type"]] += row["total"]
+        year["count"] += row["count"]
+    for year in years.values():
+        year["balance"] = year["income"] - year["expense"]
+    return list(years.values())
+
+
+def category_yearly(user_id, start_year, end_year):
+    """Income and expense per category per year."""
+    rows = (
+        MonthlySummary.objects.filter(
+            user_id=user_id, year__gte=start_year, year__lte=end_year
+        )
+        .values("year", "category__name", "transaction_type")
+        .annotate(total=Sum("total"), count=Sum("count"))
+        .order_by("year", "category__name")
+    )
+    return [
+        {
+            "year": row["year"],
+            "category": row["category__name"] or "Uncategorized",
+            "transaction_type": row["transaction_type"],
+            "total": row["total"],
+            "count": row["count"],
+        }
+        for row in rows
+    ]
+
+
+REPORTS = {
+    "yearly_summary": yearly_summary,
+    "category_yearly": category_yearly,
+}
+
+
+def _key(job_id):
+    return f"report-job:{job_id}"
+
+
+def _parse_year(data, name, default):
+    value = data.get(name, default)
+    try:
+        year = int(value)
+    except (TypeError, ValueError):
+        year = 0
+    if not 1900 <= year <= 9999:
+        raise ValidationError({name: "Expected a four-digit year."})
+    return year
+
+
+def submit(user, data):
+    """Validate a report request, record it as pending and queue it."""
+    from .tasks import generate_report
+
+    kind = data.get("kind")
+    if kind not in REPORTS:
+        raise ValidationError({"kind": f"Expected one of: {', '.join(REPORTS)}."})
+    params = {
+        "start_year": _parse_year(data, "start_year", 1900),
+        "end_year": _parse_year(data, "end_year", 9999),
+    }
+    if params["start_year"] > params["end_year"]:
+        raise ValidationError({"detail": "start_year must not be after end_year."})
+
+    job_id = str(uuid.uuid4())
+    job = {
+        "job_id": job_id,
+        "user_id": str(user.id),
+        "kind": kind,
+        "params": params,
+        "status": "pending",
+    }
+    cache.set(_key(job_id), job, timeout=settings.REPORT_JOB_TTL)
+    generate_report.delay(job_id)
+    return get(job_id)
+
+
+def get(job_id):
+    return cache.get(_key(job_id))
+
+
+def run(job_id):
+    """Compute a pending job and store its result (or failure)."""
+    job = get(job_id)
+    if job is None:
+        return
+    job["status"] = "running"
+    cache.set(_key(job_id), job, timeout=settings.REPORT_JOB_TTL)
+
+    try:
+        job["result"] = REPORTS[job["kind"]](job["user_id"], **job["params"])
+        job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        raise
+    finally:
+        cache.set(_key(job_id), job, timeout=settings.REPORT_JOB_TTL)
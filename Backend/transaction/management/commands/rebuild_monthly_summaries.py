@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from transaction import rollups
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify the MonthlySummary rollups from raw Transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report users whose rollups drifted; do not modify them.",
+        )
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="users",
+            help="Limit to the given user id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        verify = options["verify"]
+        user_ids = User.objects.order_by().values_list("id", flat=True)
+        if options["users"]:
+            user_ids = user_ids.filter(id__in=options["users"])
+
+        checked = drifted = 0
+        for user_id in user_ids.iterator(chunk_size=500):
+            checked += 1
+            expected = rollups.aggregate(user_id)
+            if expected == rollups.stored(user_id):
+                continue
+
+            drifted += 1
+            if verify:
+                self.stdout.write(f"Drift detected for user {user_id}")
+            else:
+                rollups.rebuild(user_id, expected)
+                self.stdout.write(f"Rebuilt rollups for user {user_id}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Checked {checked} users, {drifted} drifted.")
+        )
+        if verify and drifted:
+            raise CommandError(f"{drifted} users have drifted rollups.")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:07
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('category', '0004_live_indexes'),
+        ('transaction', '0004_monthlysummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-date', '-id'], name='txn_user_date_live_idx'),
+        ),
+    ]
@@ -1,7 +1,12 @@
 """Modles of Transactions app"""
 
 import uuid
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from user.models import User
 from category.models import Category
 
@@ -20,10 +25,63 @@ class Transaction(models.Model):
     )
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(default=timezone.now)
     description = models.TextField(blank=True)
     transaction_type = models.CharField(max_length=10, choices=TYPE_CHOICES)
     is_deleted = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Serves the list (ordered by -date, -id), detail and report ranges
+            models.Index(
+                fields=["user", "-date", "-id"],
+                condition=models.Q(is_deleted=False),
+                name="txn_user_date_live_idx",
+            ),
+            # Substring search on the description (icontains uses UPPER)
+            GinIndex(
+                OpClass(Upper("description"), name="gin_trgm_ops"),
+                condition=models.Q(is_deleted=False),
+                name="txn_description_trgm_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.transaction_type} - {self.amount}"
+
+
+class MonthlySummary(models.Model):
+    """Per-user monthly totals, kept in step with Transactions"""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="monthly_summaries"
+    )
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True)
+    transaction_type = models.CharField(
+        max_length=10, choices=Transaction.TYPE_CHOICES
+    )
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "year", "month", "category", "transaction_type"],
+                name="unique_monthly_summary",
+                nulls_distinct=False,
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.year}/{self.month} - {self.transaction_type}"
+
+
+@receiver(pre_delete, sender=Category)
+def handle_category_pre_delete(sender, instance, **kwargs):
+    # Its transactions become uncategorized (SET_NULL), so their rollups
+    # move to the uncategorized rows before the CASCADE below removes them
+    from . import rollups
+
+    rollups.reassign_categories([instance.id], None)
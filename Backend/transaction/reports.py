@@ -0,0 +1,134 @@
+"""Report helpers for the Transactions app"""
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import MonthlySummary, Transaction
+
+
+class Period(NamedTuple):
+    start: datetime
+    end: datetime
+    year: int = None
+    month: int = None
+
+    @property
+    def is_calendar_month(self):
+        return self.year is not None
+
+
+def local_midnight(day):
+    """Return an aware datetime for the start of `day` in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _month_bounds(year, month):
+    first_day = date(year, month, 1)
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return first_day, next_month
+
+
+def resolve_period(params):
+    """
+    Resolve the reporting period from query params.
+
+    Accepts either `year` and `month`, or `start` and `end` (inclusive,
+    YYYY-MM-DD). Falls back to the current month. Returns a `Period` whose
+    half-open `start`/`end` bounds are aware datetimes.
+    """
+    year = params.get("year")
+    month = params.get("month")
+    start = params.get("start")
+    end = params.get("end")
+
+    if (year or month) and (start or end):
+        raise ValidationError(
+            {"detail": "Use either year/month or start/end, not both."}
+        )
+
+    if start or end:
+        try:
+            start_day = parse_date(start) if start else None
+            end_day = parse_date(end) if end else None
+        except ValueError:
+            start_day = end_day = None
+        if not start_day or not end_day:
+            raise ValidationError(
+                {"detail": "Both start and end are required as YYYY-MM-DD."}
+            )
+        if start_day > end_day:
+            raise ValidationError({"detail": "start must not be after end."})
+        return Period(
+            local_midnight(start_day), local_midnight(end_day + timedelta(days=1))
+        )
+
+    today = timezone.localdate()
+    try:
+        year = int(year) if year else today.year
+        month = int(month) if month else today.month
+        first_day, next_month = _month_bounds(year, month)
+    except ValueError:
+        raise ValidationError({"detail": "Invalid year or month."})
+
+    return Period(
+        local_midnight(first_day), local_midnight(next_month), year, month
+    )
+
+
+def build_summary(user, start, end):
+    """
+    Compute income, expense and per-category totals for `user` between
+    `start` (inclusive) and `end` (exclusive) with a single grouped query.
+    """
+    rows = (
+        Transaction.objects.filter(
+            user=user, is_deleted=False, date__gte=start, date__lt=end
+        )
+        .values("category__name", "transaction_type")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    return _summarize(rows)
+
+
+def build_monthly_summary(user, year, month):
+    """
+    Compute the same totals as `build_summary` for a calendar month, reading
+    the MonthlySummary rollups instead of the raw transactions.
+    """
+    rows = (
+        MonthlySummary.objects.filter(user=user, year=year, month=month)
+        .values("category__name", "transaction_type")
+        .annotate(total=Sum("total"))
+        .order_by()
+    )
+    return _summarize(rows)
+
+
+def _summarize(rows):
+    total_income = Decimal("0")
+    total_expense = Decimal("0")
+    category_summary = {}
+    for row in rows:
+        if row["transaction_type"] == "income":
+            total_income += row["total"]
+        elif row["transaction_type"] == "expense":
+            total_expense += row["total"]
+
+        category_name = row["category__name"] or "Uncategorized"
+        category_summary[category_name] = (
+            category_summary.get(category_name, 0) + row["total"]
+        )
+
+    return {
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "total_balance": total_income - total_expense,
+        "category_summary": category_summary,
+    }
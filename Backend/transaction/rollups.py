@@ -0,0 +1,180 @@
+"""Maintenance of the MonthlySummary rollup table"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from expense_tracker.versions import bump_version
+from .models import MonthlySummary, Transaction
+
+
+def entry(transaction):
+    """
+    Return the `(key, amount)` contribution of a transaction to the rollups,
+    or None when it does not count (soft-deleted).
+    """
+    if transaction.is_deleted:
+        return None
+    local_date = timezone.localtime(transaction.date)
+    key = (
+        transaction.user_id,
+        local_date.year,
+        local_date.month,
+        transaction.category_id,
+        transaction.transaction_type,
+    )
+    return key, Decimal(transaction.amount)
+
+
+def month_version(user_id, year, month):
+    """The version of one local month of a user's transactions."""
+    return ("transactions", f"{user_id}:{year}-{month:02d}")
+
+
+def _bump_versions(keys):
+    for user_id, year, month in keys:
+        bump_version(*month_version(user_id, year, month))
+    for user_id in {key[0] for key in keys}:
+        bump_version("transactions", user_id)
+
+
+def apply(removed=(), added=()):
+    """
+    Subtract the `removed` entries and add the `added` ones. Call inside the
+    same atomic block as the Transaction write so both commit together.
+    Every write goes through here, so it also bumps the users' "transactions"
+    version, and that of each month touched, to invalidate cached aggregates.
+    """
+    deltas = defaultdict(lambda: [Decimal("0"), 0])
+    for item in removed:
+        if item:
+            key, amount = item
+            deltas[key][0] -= amount
+            deltas[key][1] -= 1
+    for item in added:
+        if item:
+            key, amount = item
+            deltas[key][0] += amount
+            deltas[key][1] += 1
+
+    for key, (amount, count) in deltas.items():
+        if amount or count:
+            _apply_delta(key, amount, count)
+
+    _bump_versions({key[:3] for key in deltas})
+
+
+def reassign_categories(source_ids, target_id):
+    """
+    Move the rollups of the `source_ids` categories onto `target_id`. Call
+    inside the same atomic block as the UPDATE re-pointing their
+    transactions. Costs one row per user, month and type, not per
+    transaction.
+    """
+    rows = list(
+        MonthlySummary.objects.select_for_update().filter(category_id__in=source_ids)
+    )
+    deltas = defaultdict(lambda: [Decimal("0"), 0])
+    for row in rows:
+        key = (row.user_id, row.year, row.month, target_id, row.transaction_type)
+        deltas[key][0] += row.total
+        deltas[key][1] += row.count
+
+    MonthlySummary.objects.filter(pk__in=[row.pk for row in rows]).delete()
+    for key, (amount, count) in deltas.items():
+        if amount or count:
+            _apply_delta(key, amount, count)
+
+    _bump_versions({(row.user_id, row.year, row.month) for row in rows})
+
+
+def _apply_delta(key, amount, count):
+    user_id, year, month, category_id, transaction_type = key
+    rows = MonthlySummary.objects.filter(
+        user_id=user_id,
+        year=year,
+        month=month,
+        category_id=category_id,
+        transaction_type=transaction_type,
+    )
+    changes = {"total": F("total") + amount, "count": F("count") + count}
+
+    if rows.update(**changes):
+        return
+    try:
+        with atomic():
+            MonthlySummary.objects.create(
+                user_id=user_id,
+                year=year,
+                month=month,
+                category_id=category_id,
+                transaction_type=transaction_type,
+                total=amount,
+                count=count,
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**changes)
+
+
+def aggregate(user_id):
+    """Compute the expected rollup rows for a user from raw Transactions."""
+    rows = (
+        Transaction.objects.filter(user_id=user_id, is_deleted=False)
+        .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values("year", "month", "category_id", "transaction_type")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    return {
+        (user_id, row["year"], row["month"], row["category_id"], row["transaction_type"]): (
+            row["total"],
+            row["count"],
+        )
+        for row in rows
+    }
+
+
+def stored(user_id):
+    """Return the rollup rows currently stored for a user."""
+    rows = MonthlySummary.objects.filter(user_id=user_id).exclude(
+        total=0, count=0
+    )
+    return {
+        (user_id, row.year, row.month, row.category_id, row.transaction_type): (
+            row.total,
+            row.count,
+        )
+        for row in rows
+    }
+
+
+def rebuild(user_id, expected=None):
+    """Replace a user's rollup rows with freshly aggregated ones."""
+    if expected is None:
+        expected = aggregate(user_id)
+    with atomic():
+        MonthlySummary.objects.filter(user_id=user_id).delete()
+        MonthlySummary.objects.bulk_create(
+            [
+                MonthlySummary(
+                    user_id=user_id,
+                    year=year,
+                    month=month,
+                    category_id=category_id,
+                    transaction_type=transaction_type,
+                    total=total,
+                    count=count,
+                )
+                for (_, year, month, category_id, transaction_type), (
+                    total,
+                    count,
+                ) in expected.items()
+            ],
+            batch_size=1000,
+        )
@@ -1,50 +1,45 @@
 from rest_framework import serializers
-from .models import Transaction, Category
+from category.cache import get_category_set
+from .models import Transaction
 from rest_framework.exceptions import ValidationError
 
 
 class TransactionSerializer(serializers.ModelSerializer):
+    # Validated against the cached category set, so no Category is loaded
+    category = serializers.UUIDField(
+        source="category_id", required=False, allow_null=True
+    )
+
     class Meta:
         model = Transaction
         exclude = ["is_deleted", "user"]
 
-    def validate_category(self, category):
+    def get_categories(self):
+        return get_category_set(self.context["request"].user.id)
+
+    def validate_category(self, category_id):
         """
         Validates the category to ensure it belongs to the user or is a default category
         and is not marked as deleted.
         """
-        user = self.context["request"].user
+        if category_id is None:
+            return None
 
-        if category and category.user != user and not category.is_default:
+        category = self.get_categories().get(category_id)
+        if category is None:
             raise ValidationError(
                 {
                     "category": "You can only use your own categories or default categories."
                 }
             )
 
-        if category and category.is_deleted:
+        if category["is_deleted"]:
             raise ValidationError(
                 {"category": "This category is no longer available (deleted)."}
             )
 
-        return category
+        return category_id
 
     def create(self, validated_data):
-        user = self.context["request"].user
-        validated_data["user"] = user
-
-        category = validated_data.get("category")
-        if category:
-            self.validate_category(category)
-
+        validated_data["user"] = self.context["request"].user
         return super().create(validated_data)
-
-    def update(self, instance, validated_data):
-        user = self.context["request"].user
-
-        # Validate category during update
-        category = validated_data.get("category")
-        if category:
-            self.validate_category(category)
-
-        return super().update(instance, validated_data)
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from . import jobs
+
+
+@shared_task
+def generate_report(job_id):
+    """Compute a queued report job and store the result in the cache."""
+    jobs.run(job_id)
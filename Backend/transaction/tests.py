@@ -1,3 +1,117 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from user.models import User
+from .models import Transaction
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are Postgres-specific")
+class TransactionIndexTests(TestCase):
+    """The live-row queries are served by txn_user_date_live_idx."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            User.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="pw98765!xyz"
+            )
+            for i in range(20)
+        ]
+        now = timezone.now()
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=users[i % len(users)],
+                amount=10,
+                transaction_type="expense",
+                date=now - timedelta(hours=i),
+                is_deleted=i % 10 == 0,
+            )
+            for i in range(5000)
+        )
+        cls.user = users[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE transaction_transaction")
+
+    def setUp(self):
+        # The seeded table is still small; make sure a usable index wins
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def test_list_uses_live_index(self):
+        queryset = Transaction.objects.filter(
+            user=self.user, is_deleted=False
+        ).order_by("-date", "-id")[:6]
+        self.assertIn("txn_user_date_live_idx", queryset.explain())
+
+    def test_date_range_uses_live_index(self):
+        end = timezone.now()
+        queryset = Transaction.objects.filter(
+            user=self.user,
+            is_deleted=False,
+            date__gte=end - timedelta(days=30),
+            date__lt=end,
+        )
+        self.assertIn("txn_user_date_live_idx", queryset.explain())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TransactionImportTests(TestCase):
+    """Malformed CSV rows are reported, not raised."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="importer", email="importer@example.com", password="pw98765!xyz"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content):
+        return self.client.post(
+            reverse("transaction-import"),
+            {"file": SimpleUploadedFile("import.csv", content)},
+            format="multipart",
+        )
+
+    def test_row_with_extra_fields_is_a_row_error(self):
+        response = self.upload(b"amount,type\n5,expense\n6,expense,groceries\n")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "row": 2,
+                    "errors": {
+                        "non_field_errors": ["Row has more fields than the header."]
+                    },
+                }
+            ],
+        )
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_only_rows_with_extra_fields_is_a_bad_request(self):
+        response = self.upload(b"amount,type\n6,expense,groceries\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["failed"], 1)
+
+    def test_trailing_empty_fields_are_ignored(self):
+        response = self.upload(b"amount,type\n5,expense,\n")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
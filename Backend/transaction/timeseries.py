@@ -0,0 +1,173 @@
+"""Bucketed income/expense time series with cached closed buckets"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from expense_tracker.versions import DEFAULTS, get_versions
+from .models import Transaction
+from .reports import local_midnight
+from .rollups import month_version
+
+TRUNCATE = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+MAX_BUCKETS = 1000
+CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def _bucket_start(day, interval):
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day, interval):
+    if interval == "week":
+        return day + timedelta(days=7)
+    if interval == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def _buckets(start, end, interval):
+    """Return `(start_day, start, end)` for each bucket overlapping [start, end)."""
+    buckets = []
+    day = _bucket_start(timezone.localtime(start).date(), interval)
+    while True:
+        bucket_start = local_midnight(day)
+        if bucket_start >= end:
+            return buckets
+        day = _next_bucket(day, interval)
+        buckets.append((bucket_start.date(), bucket_start, local_midnight(day)))
+        if len(buckets) > MAX_BUCKETS:
+            raise ValidationError(
+                {"detail": f"Too many buckets; at most {MAX_BUCKETS} per request."}
+            )
+
+
+def _empty_bucket(by_category):
+    bucket = {"income": Decimal("0"), "expense": Decimal("0")}
+    if by_category:
+        bucket["categories"] = {}
+    return bucket
+
+
+def _months(bucket_start, bucket_end):
+    """The local `(year, month)` pairs overlapping [bucket_start, bucket_end)."""
+    months = []
+    day = timezone.localtime(bucket_start).date().replace(day=1)
+    while local_midnight(day) < bucket_end:
+        months.append((day.year, day.month))
+        day = _next_bucket(day, "month")
+    return months
+
+
+def _runs(buckets):
+    """Merge consecutive buckets into `(start, end)` ranges."""
+    runs = []
+    for _, bucket_start, bucket_end in buckets:
+        if runs and runs[-1][1] == bucket_start:
+            runs[-1][1] = bucket_end
+        else:
+            runs.append([bucket_start, bucket_end])
+    return runs
+
+
+def _aggregate(user, ranges, interval, by_category):
+    """Compute the buckets within the `(start, end)` ranges with one grouped query."""
+    fields = ["bucket", "transaction_type"]
+    if by_category:
+        fields.append("category__name")
+    in_ranges = Q()
+    for range_start, range_end in ranges:
+        in_ranges |= Q(date__gte=range_start, date__lt=range_end)
+    rows = (
+        Transaction.objects.filter(in_ranges, user=user, is_deleted=False)
+        .annotate(
+            bucket=TRUNCATE[interval]("date", tzinfo=timezone.get_current_timezone())
+        )
+        .values(*fields)
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+
+    buckets = {}
+    for row in rows:
+        day = timezone.localtime(row["bucket"]).date()
+        bucket = buckets.setdefault(day, _empty_bucket(by_category))
+        bucket[row["transaction_type"]] += row["total"]
+        if by_category:
+            name = row["category__name"] or "Uncategorized"
+            categories = bucket["categories"]
+            categories[name] = categories.get(name, 0) + row["total"]
+    return buckets
+
+
+def build_timeseries(user, start, end, interval, by_category=False):
+    """
+    Return income/expense totals per bucket between `start` and `end`,
+    including empty buckets. Buckets that are closed (ended before now) and
+    fully inside the range are cached against the versions of the months
+    they cover, so a write only invalidates the buckets of its own month;
+    only the remaining buckets are recomputed.
+    """
+    if interval not in TRUNCATE:
+        raise ValidationError({"interval": "Expected day, week or month."})
+
+    buckets = _buckets(start, end, interval)
+    now = timezone.now()
+    closed = {
+        day: _months(bucket_start, bucket_end)
+        for day, bucket_start, bucket_end in buckets
+        if bucket_start >= start and bucket_end <= min(end, now)
+    }
+    months = sorted({month for covered in closed.values() for month in covered})
+    versions = get_versions(
+        ("categories", user.id),
+        ("categories", DEFAULTS),
+        *(month_version(user.id, year, month) for year, month in months),
+    )
+    month_versions = dict(zip(months, versions[2:]))
+    prefix = "timeseries:{}:{}-{}:{}:{}".format(
+        user.id, *versions[:2], interval, int(by_category)
+    )
+    cacheable = {
+        day: "{}:{}:{}".format(
+            prefix,
+            day.isoformat(),
+            "-".join(str(month_versions[month]) for month in covered),
+        )
+        for day, covered in closed.items()
+    }
+    cached = cache.get_many(cacheable.values())
+    results = {day: cached[key] for day, key in cacheable.items() if key in cached}
+
+    missing = [bucket for bucket in buckets if bucket[0] not in results]
+    if missing:
+        computed = _aggregate(
+            user,
+            [
+                (max(run_start, start), min(run_end, end))
+                for run_start, run_end in _runs(missing)
+            ],
+            interval,
+            by_category,
+        )
+        for day, _, _ in missing:
+            results[day] = computed.get(day) or _empty_bucket(by_category)
+        cache.set_many(
+            {
+                cacheable[day]: results[day]
+                for day, _, _ in missing
+                if day in cacheable
+            },
+            timeout=CACHE_TIMEOUT,
+        )
+
+    return [{"bucket": day, **results[day]} for day, _, _ in buckets]
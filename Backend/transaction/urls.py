@@ -1,7 +1,20 @@
 from django.urls import path
-from .views import TransactionCRUDView
+from .views import (
+    ReportJobView,
+    TransactionBatchView,
+    TransactionCRUDView,
+    TransactionExportView,
+    TransactionImportView,
+    TransactionTimeSeriesView,
+)
 
 urlpatterns = [
     path("<uuid:id>/", TransactionCRUDView.as_view(), name="transaction-update-delete"),
+    path("batch/", TransactionBatchView.as_view(), name="transaction-batch"),
+    path("import/", TransactionImportView.as_view(), name="transaction-import"),
+    path("export/", TransactionExportView.as_view(), name="transaction-export"),
+    path("timeseries/", TransactionTimeSeriesView.as_view(), name="transaction-timeseries"),
+    path("reports/", ReportJobView.as_view(), name="report-job-create"),
+    path("reports/<uuid:job_id>/", ReportJobView.as_view(), name="report-job-detail"),
     path("", TransactionCRUDView.as_view(), name="transaction-list-create"),
 ]
@@ -1,18 +1,32 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
-from datetime import datetime, timedelta
-import calendar
-from .models import Transaction, User
+from rest_framework.parsers import MultiPartParser
+from django.db.transaction import atomic
+from django.http import StreamingHttpResponse
+from expense_tracker.pagination import KeysetPagination
+from expense_tracker.versions import version_etag
+from . import jobs, rollups
+from .batch import apply_batch
+from .exporters import FORMATS, encode
+from .filters import filter_transactions
+from .importers import PARSERS, UnreadableRow, import_transactions
+from .models import Transaction
+from .reports import build_monthly_summary, build_summary, resolve_period
 from .serializers import TransactionSerializer
+from .timeseries import build_timeseries
+
+
+class TransactionPagination(KeysetPagination):
+    ordering = ("-date", "-id")
 
 
 class TransactionCRUDView(APIView):
+    @version_etag(lambda request, id=None: [("transactions", request.user.id)])
     def get(self, request, id=None):
         """
         If `id` is provided, return a single transaction by ID for the authenticated user.
-        Otherwise, return a list of transactions for the authenticated user.
+        Otherwise, return a filtered list of transactions for the authenticated user.
         """
         if id:
             try:
@@ -28,9 +42,11 @@ class TransactionCRUDView(APIView):
                 )
 
         # Fetch a list of transactions
-        transactions = Transaction.objects.filter(user=request.user, is_deleted=False)
-        paginator = PageNumberPagination()
-        paginator.page_size = 5
+        transactions = filter_transactions(
+            Transaction.objects.filter(user=request.user, is_deleted=False),
+            request.query_params,
+        )
+        paginator = TransactionPagination()
         paginated_transactions = paginator.paginate_queryset(transactions, request)
 
         serializer = TransactionSerializer(paginated_transactions, many=True)
@@ -43,10 +59,11 @@ class TransactionCRUDView(APIView):
         """
         data = request.data
         data["user"] = request.user.id
-        print(data["user"])
         serializer = TransactionSerializer(data=data, context={"request": request})
         if serializer.is_valid():
-            serializer.save()
+            with atomic():
+                transaction = serializer.save()
+                rollups.apply(added=[rollups.entry(transaction)])
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -55,22 +72,26 @@ class TransactionCRUDView(APIView):
         Update an existing transaction for the authenticated user.
         The user can only update their own transactions.
         """
-        try:
-            transaction = Transaction.objects.get(
-                id=id, user=request.user, is_deleted=False
-            )
-        except Transaction.DoesNotExist:
-            return Response(
-                {"detail": "Transaction not found or permission denied."},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        with atomic():
+            # Lock the row so concurrent updates subtract its current values
+            try:
+                transaction = Transaction.objects.select_for_update().get(
+                    id=id, user=request.user, is_deleted=False
+                )
+            except Transaction.DoesNotExist:
+                return Response(
+                    {"detail": "Transaction not found or permission denied."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        serializer = TransactionSerializer(
-            transaction, data=request.data, partial=True, context={"request": request}
-        )
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+            serializer = TransactionSerializer(
+                transaction, data=request.data, partial=True, context={"request": request}
+            )
+            if serializer.is_valid():
+                previous = rollups.entry(transaction)
+                transaction = serializer.save()
+                rollups.apply(removed=[previous], added=[rollups.entry(transaction)])
+                return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, id=None, **kwargs):
@@ -78,18 +99,23 @@ class TransactionCRUDView(APIView):
         Soft delete a transaction for the authenticated user.
         """
         try:
-            transaction = Transaction.objects.get(
-                id=id, user=request.user, is_deleted=False
-            )
-        except Transaction.DoesNotExist:
-            return Response(
-                {"detail": "Transaction not found or permission denied."},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            with atomic():
+                try:
+                    transaction = Transaction.objects.select_for_update().get(
+                        id=id, user=request.user, is_deleted=False
+                    )
+                except Transaction.DoesNotExist:
+                    return Response(
+                        {"detail": "Transaction not found or permission denied."},
+                        status=status.HTTP_404_NOT_FOUND,
+                    )
 
-        try:
-            transaction.is_deleted = True
-            transaction.save()
+                # Only the request that flips the flag takes it out of the rollups
+                deleted = Transaction.objects.filter(
+                    id=transaction.id, is_deleted=False
+                ).update(is_deleted=True)
+                if deleted == 1:
+                    rollups.apply(removed=[rollups.entry(transaction)])
             return Response(
                 {"detail": "Transaction deleted successfully."},
                 status=status.HTTP_204_NO_CONTENT,
@@ -101,50 +127,141 @@ class TransactionCRUDView(APIView):
             )
 
 
-class MonthlyReport(APIView):
-    def get(self, request):
+class TransactionBatchView(APIView):
+    def post(self, request):
         """
-        Generate a monthly financial report for the authenticated user.
+        Apply a list of create/update/delete operations in one database
+        transaction. If any operation is invalid, nothing is applied.
         """
+        applied, results = apply_batch(request.user, request.data.get("operations"))
+        if not applied:
+            return Response({"errors": results}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": results}, status=status.HTTP_200_OK)
 
-        today = datetime.today()
-        year = today.year
-        month = today.month
-        _, num_days = calendar.monthrange(year, month)
 
-        start_of_month = today.replace(day=1)
-        end_of_month = today.replace(day=num_days)
+class TransactionImportView(APIView):
+    parser_classes = [MultiPartParser]
 
-        transactions = Transaction.objects.filter(
-            user=request.user,
-            date__range=[start_of_month, end_of_month],
-            is_deleted=False,
+    def post(self, request):
+        """
+        Bulk import transactions from an uploaded CSV or OFX file.
+        Valid rows are created; invalid rows are reported by row number.
+        """
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response(
+                {"detail": "Upload a CSV or OFX file in the 'file' field."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        file_format = request.data.get("file_format") or upload.name.rsplit(".", 1)[-1]
+        parser = PARSERS.get(file_format.lower())
+        if parser is None:
+            return Response(
+                {"detail": "Unsupported file format. Use csv or ofx."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            created, errors = import_transactions(request.user, parser(upload.file))
+        except UnreadableRow as e:
+            # Nothing is imported from a file that cannot be read
+            return Response(
+                {"row": e.row, "detail": e.reason},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {"created": created, "failed": len(errors), "errors": errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
         )
 
-        total_income = 0
-        total_expense = 0
-        category_summary = {}
-        print(transactions)
-        for transaction in transactions:
-            if transaction.transaction_type == "income":
-                total_income += transaction.amount
-            elif transaction.transaction_type == "expense":
-                total_expense += transaction.amount
-
-            category_name = (
-                transaction.category.name if transaction.category else "Uncategorized"
+
+class TransactionExportView(APIView):
+    def get(self, request):
+        """
+        Stream the authenticated user's transactions as CSV or NDJSON.
+        Supports the list filters, `file_format` and `gzip=1`.
+        """
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in FORMATS:
+            return Response(
+                {"detail": "Unsupported file format. Use csv or ndjson."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            category_summary[category_name] = (
-                category_summary.get(category_name, 0) + transaction.amount
+        lines, content_type, extension = FORMATS[file_format]
+        compress = request.query_params.get("gzip") in ("1", "true")
+
+        transactions = filter_transactions(
+            Transaction.objects.filter(user=request.user, is_deleted=False),
+            request.query_params,
+        )
+
+        filename = f"transactions.{extension}"
+        if compress:
+            content_type = "application/gzip"
+            filename += ".gz"
+        response = StreamingHttpResponse(
+            encode(lines(transactions), compress=compress), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class TransactionTimeSeriesView(APIView):
+    def get(self, request):
+        """
+        Return income/expense totals bucketed by `interval` (day, week or
+        month) over the requested period, optionally split by category.
+        """
+        period = resolve_period(request.query_params)
+        series = build_timeseries(
+            request.user,
+            period.start,
+            period.end,
+            request.query_params.get("interval", "day"),
+            by_category=request.query_params.get("by_category") in ("1", "true"),
+        )
+        return Response(
+            {"start": period.start, "end": period.end, "results": series}
+        )
+
+
+class ReportJobView(APIView):
+    def post(self, request):
+        """
+        Queue a long-range report (`yearly_summary` or `category_yearly`)
+        for the authenticated user and return its job id.
+        """
+        job = jobs.submit(request.user, request.data)
+        return Response(_public_job(job), status=status.HTTP_202_ACCEPTED)
+
+    def get(self, request, job_id):
+        """Return the status of a report job, and its result once done."""
+        job = jobs.get(job_id)
+        if not job or job["user_id"] != str(request.user.id):
+            return Response(
+                {"detail": "Report job not found or expired."},
+                status=status.HTTP_404_NOT_FOUND,
             )
+        return Response(_public_job(job), status=status.HTTP_200_OK)
+
+
+def _public_job(job):
+    return {key: value for key, value in job.items() if key != "user_id"}
 
-        total_balance = total_income - total_expense
 
-        data = {
-            "total_income": total_income,
-            "total_expense": total_expense,
-            "total_balance": total_balance,
-            "category_summary": category_summary,
-        }
+class MonthlyReport(APIView):
+    def get(self, request):
+        """
+        Generate a financial report for the authenticated user.
+        Defaults to the current month; accepts `year`/`month` or `start`/`end`.
+        """
+        period = resolve_period(request.query_params)
+        if period.is_calendar_month:
+            data = build_monthly_summary(request.user, period.year, period.month)
+        else:
+            data = build_summary(request.user, period.start, period.end)
+        data["start"] = period.start
+        data["end"] = period.end
 
         return Response(data)
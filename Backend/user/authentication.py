@@ -1,40 +1,85 @@
-import jwt
-from rest_framework.authentication import BaseAuthentication
-from rest_framework.exceptions import AuthenticationFailed
-from .models import ActiveTokens
 from django.conf import settings
-from rest_framework.exceptions import APIException
+from django.core.cache import cache
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import User
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def denylist_cache_key(jti):
+    return f"auth-denylist:{jti}"
+
+
+def token_version_cache_key(user_id):
+    return f"auth-token-version:{user_id}"
+
+
+TOKEN_VERSION_CLAIM = "ver"
 
 
 class CustomTokenAuthentication(BaseAuthentication):
+    """
+    Single-pass JWT authentication.
+
+    The access token is decoded once, checked against the Redis `jti`
+    denylist filled on logout, and its user is resolved from the cache,
+    falling back to one primary-key query. Tokens whose version claim is
+    older than the user's current token version have been revoked.
+    """
+
     def authenticate(self, request):
-        print("-------Custome Auth Method-------")
         auth_header = request.headers.get("Authorization")
         if not auth_header:
             return None
 
+        parts = auth_header.split()
+        if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+            raise AuthenticationFailed("Invalid token")
+
         try:
-            token = auth_header.split(" ")[1]
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+            token = AccessToken(parts[1])
+        except TokenError as e:
+            raise AuthenticationFailed(str(e))
 
-            active_token = ActiveTokens.objects.filter(token=token).first()
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+        keys = [
+            denylist_cache_key(token[jwt_settings.JTI_CLAIM]),
+            user_cache_key(user_id),
+            token_version_cache_key(user_id),
+        ]
+        cached = cache.get_many(keys)
 
-            if not active_token:
-                raise AuthenticationFailed("Token is invalid or has been logged out")
+        if cached.get(keys[0]):
+            raise AuthenticationFailed("Token is invalid or has been logged out")
 
-            user = active_token.user
+        user = cached.get(keys[1]) or self.get_user(user_id)
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive")
 
-        except jwt.ExpiredSignatureError:
-            raise AuthenticationFailed("Token has expired")
-        except jwt.InvalidTokenError:
-            raise AuthenticationFailed("Invalid token")
-        except Exception as e:
-            raise UnauthorizedException(str(e))
+        # The version has its own key so revocations apply before the
+        # cached user expires
+        token_version = cached.get(keys[2], user.token_version)
+        if token.get(TOKEN_VERSION_CLAIM, 0) != token_version:
+            raise AuthenticationFailed("Token has been revoked")
+        return (user, token)
 
-        return (
-            user,
-            None,
-        )
+    def authenticate_header(self, request):
+        return f'{jwt_settings.AUTH_HEADER_TYPES[0]} realm="api"'
+
+    def get_user(self, user_id):
+        """Load a user from the database and cache it for later requests."""
+        try:
+            user = User.objects.get(**{jwt_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found")
+        cache.set(user_cache_key(user_id), user, timeout=settings.AUTH_USER_CACHE_TTL)
+        return user
 
 
 class UnauthorizedException(APIException):
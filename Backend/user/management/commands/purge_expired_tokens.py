@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from user import reaper
+
+
+class Command(BaseCommand):
+    help = "Delete expired ActiveTokens and outstanding/blacklisted JWTs in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=reaper.BATCH_SIZE,
+            help=f"Rows deleted per statement (default {reaper.BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        deleted = reaper.purge_expired_tokens(options["batch_size"])
+        for label, count in sorted(deleted.items()):
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {sum(deleted.values())} expired token rows.")
+        )
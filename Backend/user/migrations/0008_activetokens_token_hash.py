@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+# Same digest as hashlib.sha256(token.encode("utf-8")).hexdigest(), in one statement
+HASH_TOKENS = """
+UPDATE user_activetokens
+SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_alter_user_first_name_alter_user_last_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activetokens',
+            name='token_hash',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunSQL(HASH_TOKENS, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='activetokens',
+            name='token_hash',
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+        migrations.RemoveField(
+            model_name='activetokens',
+            name='token',
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_activetokens_token_hash'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='activetokens',
+            name='token_hash',
+        ),
+        migrations.AddField(
+            model_name='activetokens',
+            name='jti',
+            field=models.CharField(db_index=True, default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='activetokens',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('user', '0010_user_token_version'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='activetokens',
+            index=models.Index(fields=['expires_at'], name='activetokens_expires_at_idx'),
+        ),
+    ]
@@ -1,7 +1,13 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.db.transaction import on_commit
+from django.dispatch import receiver
 import uuid
 
+from expense_tracker.versions import bump_version
+
 
 class User(AbstractUser):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -12,6 +18,8 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     is_deleted = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
+    # Embedded in issued tokens; incrementing it revokes every session
+    token_version = models.PositiveIntegerField(default=0)
     EMAIL_FIELD = "email"
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
@@ -20,10 +28,30 @@ class User(AbstractUser):
         return str(self.username)
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def handle_user_changed(sender, instance, **kwargs):
+    # Drop the copy cached by the authenticator and the profile ETags,
+    # wherever the user was saved from (views, admin, shell, Okta login)
+    from .authentication import user_cache_key
+
+    key = user_cache_key(instance.pk)
+    on_commit(lambda: cache.delete(key))
+    bump_version("profile", instance.pk)
+
+
 class ActiveTokens(models.Model):
+    """Access tokens issued at login, so a user's sessions can be revoked."""
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="Token")
-    token = models.TextField()
+    jti = models.CharField(max_length=64, db_index=True)
+    expires_at = models.DateTimeField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["expires_at"], name="activetokens_expires_at_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user}"
@@ -0,0 +1,83 @@
+"""Okta OpenID Connect client, registered on first use"""
+
+import time
+from functools import lru_cache
+
+from authlib.integrations.django_client import DjangoOAuth2App, OAuth
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class OktaApp(DjangoOAuth2App):
+    """
+    Keeps the discovery document and the JWKS in the shared cache, so each
+    is fetched once per OKTA_METADATA_TTL across all workers instead of
+    once per process. An ID token signed with an unknown key forces a JWKS
+    refresh (see OpenIDMixin.create_load_key).
+    """
+
+    def _fetch_json(self, url):
+        with self.client_cls(**self.client_kwargs) as session:
+            resp = session.request("GET", url, withhold_token=True)
+            resp.raise_for_status()
+            return resp.json()
+
+    def load_server_metadata(self):
+        loaded_at = self.server_metadata.get("_loaded_at", 0)
+        if loaded_at + settings.OKTA_METADATA_TTL > time.time():
+            return self.server_metadata
+
+        key = f"okta-metadata:{self._server_metadata_url}"
+        metadata = cache.get(key)
+        if metadata is None:
+            metadata = self._fetch_json(self._server_metadata_url)
+            metadata["_loaded_at"] = time.time()
+            cache.set(key, metadata, timeout=settings.OKTA_METADATA_TTL)
+        self.server_metadata.update(metadata)
+        return self.server_metadata
+
+    def fetch_jwk_set(self, force=False):
+        uri = self.load_server_metadata().get("jwks_uri")
+        if not uri:
+            raise RuntimeError('Missing "jwks_uri" in metadata')
+
+        key = f"okta-jwks:{uri}"
+        jwk_set = None if force else cache.get(key)
+        if jwk_set is None:
+            jwk_set = self._fetch_json(uri)
+            cache.set(key, jwk_set, timeout=settings.OKTA_METADATA_TTL)
+        return jwk_set
+
+
+class OktaOAuth(OAuth):
+    oauth2_client_cls = OktaApp
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """
+    Return the registered Okta client. Nothing is read or fetched until the
+    first Okta login, so missing credentials only affect that endpoint.
+    """
+    if not settings.OKTA_CLIENT_ID or not settings.OKTA_CLIENT_SECRET:
+        raise ImproperlyConfigured(
+            "CLIENT_ID and CLIENT_SECRET must be set in environment variables"
+        )
+
+    oauth = OktaOAuth()
+    return oauth.register(
+        name="okta",
+        client_id=settings.OKTA_CLIENT_ID,
+        client_secret=settings.OKTA_CLIENT_SECRET,
+        server_metadata_url=settings.OKTA_METADATA_URL,
+        client_kwargs={"scope": "openid profile email"},
+    )
+
+
+@receiver(setting_changed)
+def reset_client(setting, **kwargs):
+    if setting.startswith("OKTA_"):
+        get_client.cache_clear()
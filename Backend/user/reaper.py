@@ -0,0 +1,47 @@
+"""Deletion of expired session tokens in small batches"""
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from .models import ActiveTokens
+
+BATCH_SIZE = 1000
+
+
+def _delete_in_batches(queryset, batch_size):
+    """
+    Delete the rows of `queryset` a batch at a time. Each batch is its own
+    short statement, so no lock is held for longer than one batch.
+    Returns the number of deleted rows per model.
+    """
+    deleted = {}
+    while True:
+        ids = list(queryset.order_by().values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        _, per_model = queryset.model.objects.filter(pk__in=ids).delete()
+        for label, count in per_model.items():
+            deleted[label] = deleted.get(label, 0) + count
+
+
+def purge_expired_tokens(batch_size=BATCH_SIZE):
+    """
+    Remove ActiveTokens and simplejwt OutstandingTokens that have expired.
+    Blacklist entries go with their OutstandingToken. Rows from before
+    `expires_at` was recorded are dropped once an access token would have
+    expired. Returns the number of deleted rows per model.
+    """
+    now = timezone.now()
+    access_lifetime = settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"]
+    active = ActiveTokens.objects.filter(
+        Q(expires_at__lt=now)
+        | Q(expires_at__isnull=True, created_at__lt=now - access_lifetime)
+    )
+    outstanding = OutstandingToken.objects.filter(expires_at__lt=now)
+
+    deleted = _delete_in_batches(active, batch_size)
+    for label, count in _delete_in_batches(outstanding, batch_size).items():
+        deleted[label] = deleted.get(label, 0) + count
+    return deleted
@@ -2,6 +2,7 @@ from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import serializers
 from .models import User
+from .throttling import LOGIN_PASSWORD_CHECKS
 from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 
 
@@ -27,6 +28,16 @@ class UserSerializer(serializers.ModelSerializer):
             "is_staff": {"write_only": True},
         }
 
+    def update(self, instance, validated_data):
+        """
+        Write only the submitted fields, so columns changed concurrently
+        (or stale on a cached `request.user`) are left alone.
+        """
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
     def create(self, validated_data):
         """
         Create a new user with a hashed password.
@@ -53,6 +64,7 @@ class LoginSerializer(serializers.Serializer):
         username = data.get("username")
         password = data.get("password")
 
+        LOGIN_PASSWORD_CHECKS.inc()
         user = authenticate(username=username, password=password)
         if not user:
             raise AuthenticationFailed("Invalid credentials")
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from . import reaper
+
+
+@shared_task
+def purge_expired_tokens():
+    """Scheduled by Celery beat; see CELERY_BEAT_SCHEDULE."""
+    return reaper.purge_expired_tokens()
@@ -1,3 +1,37 @@
-from django.test import TestCase
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
-# Create your tests here.
+from .throttling import LoginRateThrottle
+
+
+class LoginRateThrottleTests(SimpleTestCase):
+    """The per-IP login bucket cannot be dodged with X-Forwarded-For."""
+
+    def ip_bucket(self, **headers):
+        request = APIRequestFactory().post(
+            "/api/users/login/", {"username": "someone"}, format="json", **headers
+        )
+        buckets = LoginRateThrottle().get_buckets(
+            Request(request, parsers=[JSONParser()])
+        )
+        return dict(buckets)["ip"]
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        buckets = {
+            self.ip_bucket(REMOTE_ADDR="203.0.113.7", HTTP_X_FORWARDED_FOR=spoofed)
+            for spoofed in ("198.51.100.1", "198.51.100.2", "198.51.100.3, 10.0.0.1")
+        }
+
+        self.assertEqual(buckets, {"203.0.113.7"})
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_address_appended_by_trusted_proxy_is_used(self):
+        bucket = self.ip_bucket(
+            REMOTE_ADDR="10.0.0.2",
+            HTTP_X_FORWARDED_FOR="198.51.100.1, 203.0.113.7",
+        )
+
+        self.assertEqual(bucket, "203.0.113.7")
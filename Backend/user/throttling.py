@@ -0,0 +1,94 @@
+"""Redis token-bucket throttling for the login endpoint"""
+
+import logging
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+LOGIN_THROTTLED = Counter(
+    "expense_tracker_login_throttled_total",
+    "Login attempts rejected by a token bucket before the password was hashed.",
+    ["scope"],
+)
+LOGIN_PASSWORD_CHECKS = Counter(
+    "expense_tracker_login_password_checks_total",
+    "Login attempts that reached the password hasher.",
+)
+
+# Refills every bucket in KEYS (capacity and tokens per second in ARGV, one
+# pair per key), then takes one token from each only if all of them have
+# one. Returns the 1-based index of the first empty bucket (0 if allowed)
+# and the seconds until it holds a token again.
+TOKEN_BUCKET = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tokens = {}
+local blocked, wait = 0, 0
+for i, key in ipairs(KEYS) do
+    local capacity, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+    local state = redis.call("HMGET", key, "tokens", "ts")
+    local available = tonumber(state[1]) or capacity
+    local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+    tokens[i] = math.min(capacity, available + elapsed * rate)
+    if tokens[i] < 1 and blocked == 0 then
+        blocked, wait = i, (1 - tokens[i]) / rate
+    end
+end
+for i, key in ipairs(KEYS) do
+    local capacity, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+    if blocked == 0 then
+        tokens[i] = tokens[i] - 1
+    end
+    redis.call("HSET", key, "tokens", tostring(tokens[i]), "ts", tostring(now))
+    redis.call("PEXPIRE", key, math.max(1, math.ceil((capacity - tokens[i]) / rate * 1000)))
+end
+return {blocked, tostring(wait)}
+"""
+
+
+class LoginRateThrottle(BaseThrottle):
+    """
+    Per-IP and per-username token buckets for login attempts, kept in
+    Redis and checked in one round trip. Runs before the view, so
+    throttled attempts never reach the password hasher. If Redis is
+    unavailable the attempt is let through.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_buckets(self, request):
+        buckets = [("ip", self.get_ident(request))]
+        username = request.data.get("username")
+        if isinstance(username, str) and username.strip():
+            buckets.append(("username", username.strip().lower()[:150]))
+        return buckets
+
+    def allow_request(self, request, view):
+        buckets = self.get_buckets(request)
+        keys, args = [], []
+        for scope, ident in buckets:
+            capacity, rate = settings.LOGIN_THROTTLE_BUCKETS[scope]
+            keys.append(f"login-throttle:{scope}:{ident}")
+            args.extend([capacity, rate])
+
+        try:
+            connection = get_redis_connection("default")
+            blocked, wait = connection.register_script(TOKEN_BUCKET)(keys, args)
+        except RedisError:
+            logger.warning("Login throttle unavailable", exc_info=True)
+            return True
+
+        if not blocked:
+            return True
+        LOGIN_THROTTLED.labels(scope=buckets[int(blocked) - 1][0]).inc()
+        self.retry_after = float(wait)
+        return False
+
+    def wait(self):
+        return self.retry_after
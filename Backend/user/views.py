@@ -1,42 +1,33 @@
-import os
 import urllib.parse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny 
 from rest_framework.exceptions import AuthenticationFailed, ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 from .serializers import UserSerializer, LoginSerializer
+from .throttling import LoginRateThrottle
 from .models import ActiveTokens, User
-from authlib.integrations.django_client import OAuth
+from .authentication import (
+    TOKEN_VERSION_CLAIM,
+    denylist_cache_key,
+    token_version_cache_key,
+    user_cache_key,
+)
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.utils import timezone
 from asgiref.sync import sync_to_async
-from dotenv import load_dotenv
-load_dotenv()
-
 
 from category.models import Category
+from expense_tracker.versions import bump_version, version_etag
 from django.contrib.auth import authenticate
-
-CLIENT_ID = os.getenv("CLIENT_ID")
-CLIENT_SECRET = os.getenv("CLIENT_SECRET")
-OKTA_DOMAIN = os.getenv("OKTA_DOMAIN", "integrator-9568283.okta.com")
-if not CLIENT_ID or not CLIENT_SECRET:
-    raise ValueError("CLIENT_ID and CLIENT_SECRET must be set in environment variables")
-
-
-oauth = OAuth()
-oauth.register(
-    name='okta',
-    client_id=CLIENT_ID,
-    client_secret=CLIENT_SECRET,
-    server_metadata_url=f'https://{OKTA_DOMAIN}/oauth2/default/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid profile email',
-    }
-)
+from . import okta
 
 class UserCreateView(APIView):
     permission_classes = [AllowAny]
@@ -68,6 +59,7 @@ class UserCreateView(APIView):
 
 class GetUpdateUserView(APIView):
 
+    @version_etag(lambda request: [("profile", request.user.id)])
     def get(self, request):
         """
         Get the authenticated user's details.
@@ -96,6 +88,7 @@ class GetUpdateUserView(APIView):
 
         if user.is_staff:
             Category.objects.filter(user=user).update(user=None)
+            bump_version("categories", user.id)
         # else:
         #     Category.objects.filter(user=user).update(is_deleted=True)
 
@@ -104,7 +97,7 @@ class GetUpdateUserView(APIView):
         TokenHandeling.blacklist_refresh_token(refresh_token)
 
         user.is_deleted = True
-        user.save()
+        user.save(update_fields=["is_deleted"])
 
         return Response(
             {"detail": "User deleted (soft-deleted) successfully."},
@@ -169,7 +162,7 @@ class UpdatePasswordUserView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         request.user.set_password(new_password)
-        request.user.save()
+        request.user.save(update_fields=["password"])
         TokenHandeling.invalidate_user_tokens(request.user)
         return Response(
             {"detail": "Password updated successfully."},
@@ -180,6 +173,7 @@ class UpdatePasswordUserView(APIView):
 class LoginView(APIView):
 
     permission_classes = [AllowAny]
+    throttle_classes = [LoginRateThrottle]
 
     def post(self, request):
         """
@@ -188,10 +182,7 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data["user"]
-            access_token = str(AccessToken.for_user(user))
-            refresh_token = str(RefreshToken.for_user(user))
-
-            ActiveTokens.objects.create(user=user, token=access_token)
+            access_token, refresh_token = TokenHandeling.issue_tokens(user)
 
             return Response(
                 {
@@ -219,16 +210,21 @@ class LoginViewOkta(APIView):
 
     def get(self, request):
         # We use request._request because DRF wraps the standard Django request
+        try:
+            client = okta.get_client()
+        except ImproperlyConfigured as e:
+            return Response(
+                {"detail": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         redirect_uri = request.build_absolute_uri(reverse('auth_callback'))
-        print("REDIRECT URI --->", redirect_uri)
-        return oauth.okta.authorize_redirect(request._request, redirect_uri)
+        return client.authorize_redirect(request._request, redirect_uri)
 
 class OktaCallbackView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
         try:
-            token = oauth.okta.authorize_access_token(request._request)
+            token = okta.get_client().authorize_access_token(request._request)
             user_info = token.get('userinfo')
             
             if not user_info:
@@ -251,10 +247,7 @@ class OktaCallbackView(APIView):
                 }
             )
 
-            access_token = str(AccessToken.for_user(user))
-            refresh_token = str(RefreshToken.for_user(user))
-
-            ActiveTokens.objects.create(user=user, token=access_token)
+            access_token, refresh_token = TokenHandeling.issue_tokens(user)
 
             # ---------------------------------------------------------
             # CHANGE IS HERE: REDIRECT TO FRONTEND INSTEAD OF RETURNING JSON
@@ -282,11 +275,7 @@ class LogoutView(APIView):
         Log out the user.
         """
         try:
-            access_token = request.headers.get("Authorization")
-
-            access_token = access_token.split(" ")[1]
-
-            TokenHandeling.invalidate_last_active_token(access_token)
+            TokenHandeling.invalidate_last_active_token(request.auth)
 
             refresh_token = request.data.get("refresh_token")
             if not refresh_token:
@@ -311,18 +300,51 @@ class TokenHandeling:
     TokenHandeling class for handling token-related operations.
     """
 
+    @staticmethod
+    def issue_tokens(user):
+        """
+        Create an access/refresh token pair for a user and record the
+        access token so it can be revoked later.
+        """
+        refresh_token = RefreshToken.for_user(user)
+        # Copied into access tokens issued from this refresh token as well
+        refresh_token[TOKEN_VERSION_CLAIM] = user.token_version
+        access_token = refresh_token.access_token
+
+        ActiveTokens.objects.create(
+            user=user,
+            jti=access_token["jti"],
+            expires_at=datetime_from_epoch(access_token["exp"]),
+        )
+        return str(access_token), str(refresh_token)
+
     @staticmethod
     def invalidate_user_tokens(user):
         """
-        Invalidate all active tokens for a given user.
+        Invalidate all active tokens for a given user by bumping their
+        token version; tokens carrying an older version are rejected.
         """
-        active_tokens = ActiveTokens.objects.filter(user=user)
-        for token_obj in active_tokens:
-            token_obj.delete()
+        User.objects.filter(pk=user.pk).update(token_version=F("token_version") + 1)
+        user.refresh_from_db(fields=["token_version"])
+        cache.set(
+            token_version_cache_key(user.id),
+            user.token_version,
+            timeout=int(settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds()),
+        )
+        TokenHandeling.forget_cached_user(user)
 
     @staticmethod
     def invalidate_last_active_token(access_token):
-        ActiveTokens.objects.filter(token=access_token).delete()
+        """Deny an access token until it expires."""
+        ttl = int(access_token["exp"] - timezone.now().timestamp())
+        if ttl > 0:
+            cache.set(denylist_cache_key(access_token["jti"]), True, timeout=ttl)
+        ActiveTokens.objects.filter(jti=access_token["jti"]).delete()
+
+    @staticmethod
+    def forget_cached_user(user):
+        """Drop the cached copy of a user used by the authenticator."""
+        cache.delete(user_cache_key(user.id))
 
     @staticmethod
     def blacklist_refresh_token(refresh_token):